@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Measures the throughput of helpers.batch.diagnose, in logs per second, for each number of workers. Run from the
+repository's root with `python3 -m benchmarks.batch`.
+"""
+import argparse
+import itertools
+import os
+import time
+
+from helpers import batch
+
+LOGS = [
+    "foo.c:5:12: error: implicit declaration of function 'get_int' is invalid in C99 "
+        "[-Werror,-Wimplicit-function-declaration]\n"
+        "   int x = get_int();\n"
+        "           ^\n"
+        "1 error generated.\n"
+        "make: *** [foo] Error 1",
+    "foo.c:1:1: error: unknown type name 'string'\nstring s = get_string();\n^",
+    "make: *** No rule to make target 'ceasar'.  Stop.",
+    "bash: ./foo: No such file or directory",
+    "Segmentation fault (core dumped)",
+    "==4412== Memcheck, a memory error detector\n"
+        "==4412== Command: ./a.out\n"
+        "==4412== Invalid read of size 4\n"
+        "==4412==    at 0x40054F: foo (foo.c:7)\n"
+        "==4412==    by 0x400568: main (foo.c:12)\n"
+        "==4412== ERROR SUMMARY: 1 errors from 1 contexts",
+    "rm: remove regular file ‘foo’?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("-n", "--logs", type=int, default=20000, help="number of logs per run")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", help="worker counts to try (default: 1 to #CPUs)")
+    parser.add_argument("-c", "--chunksize", type=int, help="logs per chunk (default: four chunks per worker)")
+    args = parser.parse_args()
+
+    logs = list(itertools.islice(itertools.cycle(LOGS), args.logs))
+    for workers in args.workers or range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        batch.diagnose(logs, workers=workers, chunksize=args.chunksize)
+        elapsed = time.perf_counter() - start
+        print("{:>3} workers {:>10.0f} logs/s".format(workers, len(logs) / elapsed))
+
+
+if __name__ == "__main__":
+    main()
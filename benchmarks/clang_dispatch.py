@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compares dispatching clang diagnostics through the message index against trying every clang helper in turn,
+as help50 does (with _match composing and searching each helper's expression anew, as it did before the index),
+over corpora of increasing size. Run from the repository's root with
+`python3 -m benchmarks.clang_dispatch`.
+"""
+import argparse
+import random
+import re
+import timeit
+
+from help50 import HELPERS
+
+from helpers import clang
+
+from . import corpus
+
+DIAGNOSTICS = [
+    ["foo.c:5:12: error: implicit declaration of function 'get_int' is invalid in C99 "
+         "[-Werror,-Wimplicit-function-declaration]",
+     "   int x = get_int();",
+     "           ^"],
+    ["foo.c:1:1: error: unknown type name 'string'",
+     "string s = get_string();",
+     "^"],
+    ["foo.c:5:22: error: expected ';' after expression",
+     "    printf(\"hello\")",
+     "                     ^",
+     "                     ;"],
+    ["foo.c:6:8: error: declaration shadows a local variable [-Werror,-Wshadow]",
+     "   int x = 28;",
+     "       ^"],
+    ["foo.c:5:9: error: unused variable 'x' [-Werror,-Wunused-variable]",
+     "    int x;",
+     "        ^"],
+    ["foo.c:28:28: error: expected expression"],
+    ["foo.c:(.text+0x9): undefined reference to `get_int'"],
+]
+
+
+def diagnostics(count, seed=0):
+    """Returns count diagnostics, drawn at random from DIAGNOSTICS and the corpus's, with random positions."""
+    rand = random.Random(seed)
+    blocks = []
+    for _ in range(count):
+        block = rand.choice(DIAGNOSTICS + corpus.CLANG)
+        blocks.append([line.format(file=rand.choice(corpus.FILES), line=rand.randint(1, 500),
+                                   column=rand.randint(1, 80), note=rand.randint(1, 500)) for line in block])
+    return blocks
+
+
+def sequential(lines):
+    """Tries every clang helper in order of registration, as help50 does."""
+    for func in HELPERS["clang"]:
+        help = func(lines)
+        if help:
+            return help
+
+
+def unindexed(expression, line, raw=False):
+    """Matches as _match did before the index, composing each query anew and searching it per re's own cache."""
+    query = expression if raw else clang._HEADER + expression
+    matches = re.search(query, line)
+
+    if not matches:
+        return None
+
+    if raw:
+        return clang._ClangMatch(file=None, line=None, group=matches.groups())
+
+    return clang._ClangMatch(file=matches.group(1),
+                             line=matches.group(2),
+                             group=matches.groups()[2:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("-s", "--sizes", nargs="+", type=int, default=[1, 100, 10000],
+                        help="diagnostics per corpus")
+    parser.add_argument("-n", "--number", type=int, default=10000, help="dispatches per size per repeat")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="repeats, of which the best is reported")
+    args = parser.parse_args()
+
+    match = clang._match
+
+    print("{:>7} {:<35} {:>16} {:>8}".format("size", "dispatch", "µs/diagnostic", "speedup"))
+    for size in args.sizes:
+        blocks = diagnostics(size)
+        number = max(1, args.number // size)
+
+        def scan():
+            for lines in blocks:
+                sequential(lines)
+
+        def dispatch():
+            for lines in blocks:
+                clang._dispatch(lines)
+
+        results = []
+        for name, func, indexed in [("sequential scan, unindexed", scan, False),
+                                    ("sequential scan, indexed _match", scan, True),
+                                    ("indexed _dispatch", dispatch, True)]:
+            clang._match = match if indexed else unindexed
+            try:
+                best = min(timeit.repeat(func, number=number, repeat=args.repeat))
+            finally:
+                clang._match = match
+            results.append((name, best / (number * size)))
+
+        baseline = results[0][1]
+        for name, seconds in results:
+            print("{:>7} {:<35} {:>16.2f} {:>7.1f}x".format(size, name, seconds * 1e6, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
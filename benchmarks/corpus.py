@@ -0,0 +1,170 @@
+"""
+Generates realistic, synthetic output for each domain, of (approximately) any number of lines.
+"""
+import random
+
+CLANG = [
+    ["{file}:{line}:{column}: error: implicit declaration of function 'get_int' is invalid in C99 "
+         "[-Werror,-Wimplicit-function-declaration]",
+     "    int x = get_int(\"x: \");",
+     "            ^"],
+    ["{file}:{line}:{column}: error: unknown type name 'string'",
+     "    string s = get_string(\"s: \");",
+     "    ^"],
+    ["{file}:{line}:{column}: error: expected ';' after expression",
+     "    printf(\"hello, world\\n\")",
+     "                             ^",
+     "                             ;"],
+    ["{file}:{line}:{column}: error: use of undeclared identifier 'i'",
+     "    for (i = 0; i < n; i++)",
+     "         ^"],
+    ["{file}:{line}:{column}: error: unused variable 'y' [-Werror,-Wunused-variable]",
+     "    int y;",
+     "        ^"],
+    ["{file}:{line}:{column}: error: declaration shadows a local variable [-Werror,-Wshadow]",
+     "        int x = 28;",
+     "            ^",
+     "{file}:{note}:9: note: previous declaration is here",
+     "    int x = get_int(\"x: \");",
+     "        ^"],
+    ["{file}:{line}:{column}: error: format specifies type 'int' but the argument has type 'char *' "
+         "[-Werror,-Wformat]",
+     "    printf(\"%i\\n\", s);",
+     "            ~~     ^"],
+    ["{file}:{line}:{column}: error: expected expression"],
+]
+
+MAKE = [
+    "make: *** No rule to make target '{target}'.  Stop.",
+    "make: *** No targets specified and no makefile found.  Stop.",
+    "make: Nothing to be done for '{target}.c'.",
+    "make: '{target}' is up to date.",
+    "make: *** [<builtin>: {target}] Error 1",
+]
+
+BASH = [
+    "bash: cd: {target}: No such file or directory",
+    "bash: cd: {target}.c: Not a directory",
+    "bash: {target}: command not found",
+    "bash: ./{target}: No such file or directory",
+    "bash: ./{target}.c: Permission denied",
+]
+
+PROMPTS = {
+    "cp": ["cp: overwrite ‘{target}’?", "cp: overwrite ‘src/{target}’?"],
+    "ls": ["ls: cannot access {target}: No such file or directory"],
+    "mv": ["mv: overwrite ‘{target}’?", "mv: overwrite ‘bin/{target}’?"],
+    "rm": ["rm: remove regular file ‘{target}’?", "rm: remove regular empty file ‘{target}’?"],
+    "runtime": ["Floating point exception (core dumped)", "Segmentation fault (core dumped)"],
+}
+
+VALGRIND_ERRORS = [
+    ["Invalid read of size 4",
+     "   at 0x40054F: {function} ({file}:{line})",
+     "   by 0x400568: main ({file}:{note})"],
+    ["Invalid write of size 1",
+     "   at 0x4C32E0D: strcpy (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so)",
+     "   by 0x400546: {function} ({file}:{line})",
+     "   by 0x400568: main ({file}:{note})"],
+    ["Conditional jump or move depends on uninitialised value(s)",
+     "   at 0x508299B: _itoa_word (_itoa.c:179)",
+     "   by 0x5086636: vfprintf (vfprintf.c:1660)",
+     "   by 0x508D3D8: printf (printf.c:33)",
+     "   by 0x40054C: main ({file}:{line})"],
+    ["Use of uninitialised value of size 8",
+     "   at 0x40054F: {function} ({file}:{line})",
+     "   by 0x400568: main ({file}:{note})"],
+]
+
+FILES = ["caesar.c", "mario.c", "credit.c", "readability.c", "speller.c", "dictionary.c", "recover.c"]
+TARGETS = ["caesar", "ceasar", "mario", "credit", "readability", "speller", "recover", "filter", "tideman"]
+FUNCTIONS = ["load", "check", "unload", "hash", "sort_pairs", "lock_pairs", "blur"]
+
+
+def clang(lines, seed=0):
+    """Returns about lines lines of clang's output, as from compiling a very broken file."""
+    rand = random.Random(seed)
+    output = []
+    while len(output) < lines:
+        for line in rand.choice(CLANG):
+            output.append(line.format(file=rand.choice(FILES), line=rand.randint(1, 500),
+                                      column=rand.randint(1, 80), note=rand.randint(1, 500)))
+    output.append("{} errors generated.".format(len(output)))
+    return output[:max(lines, 1)]
+
+
+def make(lines, seed=0):
+    """Returns lines lines of make's output."""
+    rand = random.Random(seed)
+    return [rand.choice(MAKE).format(target=rand.choice(TARGETS)) for _ in range(lines)]
+
+
+def bash(lines, seed=0):
+    """Returns lines lines of bash's errors."""
+    rand = random.Random(seed)
+    return [rand.choice(BASH).format(target=rand.choice(TARGETS)) for _ in range(lines)]
+
+
+def prompt(domain, lines, seed=0):
+    """Returns lines lines of domain's (e.g., cp's) prompts or errors."""
+    rand = random.Random(seed)
+    return [rand.choice(PROMPTS[domain]).format(target=rand.choice(TARGETS)) for _ in range(lines)]
+
+
+def valgrind(lines, seed=0):
+    """Returns about lines lines of Memcheck's output for a program with many errors and leaks."""
+    rand = random.Random(seed)
+    pid = rand.randint(1000, 99999)
+    body = [
+        "Memcheck, a memory error detector",
+        "Copyright (C) 2002-2017, and GNU GPL'd, by Julian Seward et al.",
+        "Using Valgrind-3.14.0 and LibVEX; rerun with -h for copyright info",
+        "Command: ./speller texts/lalaland.txt",
+        "",
+    ]
+
+    footer = [
+        "",
+        "HEAP SUMMARY:",
+        "    in use at exit: 8,013,096 bytes in 143,091 blocks",
+        "  total heap usage: 143,096 allocs, 5 frees, 8,023,256 bytes allocated",
+        "",
+        "40 bytes in 1 blocks are definitely lost in loss record 1 of 2",
+        "   at 0x4C2AB80: malloc (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so)",
+        "   by 0x400546: load (dictionary.c:42)",
+        "   by 0x400568: main (speller.c:40)",
+        "",
+        "8,013,096 (1,456 direct, 8,011,640 indirect) bytes in 26 blocks are definitely lost in loss record 2 of 2",
+        "   at 0x4C2AB80: malloc (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so)",
+        "   by 0x400546: load (dictionary.c:57)",
+        "   by 0x400568: main (speller.c:40)",
+        "",
+        "LEAK SUMMARY:",
+        "   definitely lost: 1,496 bytes in 27 blocks",
+        "   indirectly lost: 8,011,640 bytes in 143,064 blocks",
+        "",
+        "For counts of detected and suppressed errors, rerun with: -v",
+        "ERROR SUMMARY: {} errors from {} contexts (suppressed: 0 from 0)",
+    ]
+
+    errors = 0
+    while len(body) + len(footer) < lines:
+        for line in rand.choice(VALGRIND_ERRORS):
+            body.append(line.format(file=rand.choice(FILES), line=rand.randint(1, 500),
+                                    note=rand.randint(1, 500), function=rand.choice(FUNCTIONS)))
+        body.append("")
+        errors += 1
+    body.extend(footer)
+    body[-1] = body[-1].format(errors, errors)
+
+    return ["=={}== {}".format(pid, line).rstrip() for line in body]
+
+
+def corpus(domain, lines, seed=0):
+    """Returns lines of domain's output."""
+    if domain in PROMPTS:
+        return prompt(domain, lines, seed)
+    return globals()[domain](lines, seed)
+
+
+DOMAINS = ["bash", "clang", "make", "valgrind"] + sorted(PROMPTS)
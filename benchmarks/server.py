@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measures helpers.server's latency, per request, with many clients asking for help at once, each connecting
+anew for each request, as helpers.client does. Run from the repository's root with `python3 -m benchmarks.server`.
+"""
+import argparse
+import concurrent.futures
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from helpers import client
+
+from . import corpus
+from .suite import percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("-c", "--clients", type=int, default=100, help="clients asking at once")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests in all")
+    parser.add_argument("-l", "--lines", type=int, default=20, help="lines of output per request")
+    parser.add_argument("-w", "--workers", type=int, help="the server's workers (by default, one per CPU)")
+    args = parser.parse_args()
+
+    outputs = ["\n".join(corpus.corpus(domain, args.lines, seed)) for seed in range(10) for domain in corpus.DOMAINS]
+    path = os.path.join(tempfile.mkdtemp(), "help50.sock")
+
+    command = [sys.executable, "-m", "helpers.server", "--socket", path]
+    if args.workers is not None:
+        command += ["--workers", str(args.workers)]
+    server = subprocess.Popen(command)
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.05)
+
+        def ask(i):
+            start = time.perf_counter()
+            client.request(outputs[i % len(outputs)], path)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(args.clients) as executor:
+            samples = list(executor.map(ask, range(args.requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    p50, p90, p99 = percentiles(samples)
+    print("{} requests from {} clients: p50 {:.1f} ms, p90 {:.1f} ms, p99 {:.1f} ms, {:.0f} requests/s".format(
+        args.requests, args.clients, p50 * 1e3, p90 * 1e3, p99 * 1e3, args.requests / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Times every helper, and each domain's dispatch, against synthetic output of increasing size, reporting latency
+percentiles and throughput. Run from the repository's root with `python3 -m benchmarks.suite`.
+"""
+import argparse
+import statistics
+import time
+
+from help50 import HELPERS
+
+import helpers
+from helpers import dispatch
+
+from . import corpus
+
+
+def measure(func, make_args, repeat):
+    """Returns the durations, in seconds, of repeat calls to func, each with fresh arguments from make_args."""
+    samples = []
+    for _ in range(repeat):
+        args = make_args()
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentiles(samples):
+    """Returns the 50th, 90th, and 99th percentiles of samples."""
+    if len(samples) == 1:
+        return samples * 3
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("-d", "--domains", nargs="+", default=corpus.DOMAINS, choices=corpus.DOMAINS)
+    parser.add_argument("-s", "--scales", nargs="+", type=int, default=[1, 1000, 100000],
+                        help="lines of output per log")
+    parser.add_argument("-r", "--repeat", type=int, default=50,
+                        help="calls per measurement (fewer for large logs, but at least 3)")
+    args = parser.parse_args()
+
+    print("{:<9} {:>7} {:<36} {:>10} {:>10} {:>10} {:>14}".format(
+        "domain", "lines", "helper", "p50 µs", "p90 µs", "p99 µs", "lines/s"))
+
+    for domain in args.domains:
+        helpers.load(domain)
+        for scale in args.scales:
+            lines = corpus.corpus(domain, scale)
+            output = "\n".join(lines)
+            repeat = max(3, min(args.repeat, 10**6 // max(scale, 1)))
+
+            # each helper, given a fresh copy of the lines lest it reuse what it parsed last time
+            results = [(helper.__name__, measure(helper, lambda: (list(lines),), repeat))
+                       for helper in HELPERS.get(domain, [])]
+
+            # the whole domain, as help50 would try it
+            results.append(("(dispatch)", measure(dispatch.diagnose, lambda: (output, [domain]), repeat)))
+
+            for name, samples in results:
+                p50, p90, p99 = percentiles(samples)
+                print("{:<9} {:>7} {:<36} {:>10.1f} {:>10.1f} {:>10.1f} {:>14.0f}".format(
+                    domain, len(lines), name, p50 * 1e6, p90 * 1e6, p99 * 1e6, len(lines) / p50 if p50 else 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,58 @@
-from . import bash, clang, cp, ls, make, mv, rm, runtime, valgrind
+import importlib
+
+from help50 import HELPERS, preprocessor
+
+# each domain's helpers live in a module of the same name, which registers them with help50 when imported
+DOMAINS = ("bash", "clang", "cp", "ls", "make", "mv", "rm", "runtime", "valgrind")
+
+# the modules loaded thus far, keyed on domain
+_modules = {}
+
+
+def load(domain):
+    """
+    Returns the module for domain, importing it (and thereby registering its helpers with help50) the first time
+    the domain is requested, or None if domain isn't one of DOMAINS.
+    """
+    try:
+        return _modules[domain]
+    except KeyError:
+        if domain not in DOMAINS:
+            return None
+        module = _modules[domain] = importlib.import_module("." + domain, __name__)
+        return module
+
+
+def load_all():
+    """Imports every domain's module."""
+    if len(_modules) < len(DOMAINS):
+        for domain in DOMAINS:
+            load(domain)
+
+
+def __getattr__(name):
+    """Imports domains' modules on first access (e.g., helpers.clang)."""
+    module = load(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    return module
+
+
+def _loader(domain):
+    """
+    Returns a preprocessor for domain that loads domain's module, and so registers its own preprocessors and
+    helpers, when help50 first preprocesses output for domain. Returns output as is.
+    """
+    def load_domain(output):
+        load(domain)
+        return output
+    return load_domain
+
+
+# help50 imports this package, then tries each domain in the order its helpers were registered, preprocessing
+# output with each of the domain's preprocessors (including any registered while doing so) before trying its
+# helpers; each domain is thus registered in order, with no helpers as yet, and with a preprocessor that loads
+# its module, lest any domain's module be loaded before help50 gets to it
+for _domain in DOMAINS:
+    HELPERS.setdefault(_domain, [])
+    preprocessor(_domain)(_loader(_domain))
@@ -1,2 +1,6 @@
 FILE_PATH = "(?:(?:.*)\/(?:[^/]+)\/)?"
 BASH_PATH = "{}(?:ba)?sh".format(FILE_PATH)
+ANSI = r"\x1B\[[0-?]*[ -/]*[@-~]"
+MEMCHECK = r"^==\d+== Memcheck, a memory error detector$"
+CLANG = r"^[^:\s]+:\d+:\d+: (?:warning|(?:fatal |runtime )?error): "
+MAKE = r"^make(?:\[\d+\])?: "
@@ -0,0 +1,142 @@
+"""
+A compact, read-only map of strings to strings, built offline and stored in a file that's memory-mapped rather
+than read, so that loading it costs next to nothing and each lookup O(1), however many keys it holds.
+
+The file is "H50I", then the number of slots and of values (as little-endian uint32s); then each slot, as the
+offsets of its key (0 if the slot is empty) and of its value's offset (uint32s); then each value's offset
+(uint32s); then the keys and values themselves, NUL-terminated. Keys are hashed with CRC-32 into a table at most
+half full, whence collisions are resolved by probing linearly.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+# where indexes are stored, unless told otherwise
+DIRECTORY = os.environ.get("HELP50_INDEX") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "help50")
+
+_MAGIC = b"H50I"
+_HEADER = struct.Struct("<4sII")
+_SLOT = struct.Struct("<II")
+_OFFSET = struct.Struct("<I")
+
+# each index mapped thus far, keyed on its path
+_indexes = {}
+
+
+class Index:
+    """
+    A memory-mapped index.
+
+      >>> path = os.path.join(tempfile.mkdtemp(), "test.idx")
+      >>> write(path, {"printf": "stdio.h", "malloc": "stdlib.h", "puts": "stdio.h"})
+      >>> index = Index(path)
+      >>> index.get("printf"), index.get("malloc"), index.get("get_int"), len(index)
+      ('stdio.h', 'stdlib.h', None, 3)
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self._slots, self._values = _HEADER.unpack_from(self._map)
+            if magic != _MAGIC or not self._slots or self._slots & (self._slots - 1):
+                raise ValueError("not an index: {}".format(path))
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+
+    def __len__(self):
+        return sum(1 for i in range(self._slots) if _SLOT.unpack_from(self._map, _HEADER.size + i * _SLOT.size)[0])
+
+    def get(self, key, default=None):
+        """
+        Returns key's value, else default, as it does if the index proves truncated or corrupt.
+
+          >>> path = os.path.join(tempfile.mkdtemp(), "test.idx")
+          >>> write(path, {"printf": "stdio.h"})
+          >>> with open(path, "r+b") as f:
+          ...     _ = f.truncate(_HEADER.size + _SLOT.size)
+          >>> Index(path).get("printf", "?")
+          '?'
+        """
+        key = key.encode("utf-8")
+        i = zlib.crc32(key) & (self._slots - 1)
+        try:
+            for _ in range(self._slots):
+                offset, value = _SLOT.unpack_from(self._map, _HEADER.size + i * _SLOT.size)
+                if not offset:
+                    break
+                if self._string(offset) == key:
+                    return self._string(_OFFSET.unpack_from(self._map, value)[0]).decode("utf-8")
+                i = (i + 1) & (self._slots - 1)
+        except (ValueError, IndexError, struct.error):
+            pass
+        return default
+
+    def close(self):
+        self._map.close()
+
+    def _string(self, offset):
+        return self._map[offset:self._map.find(b"\0", offset)]
+
+
+def lookup(path, key):
+    """
+    Returns key's value per the index at path, else None if there's no such key (or valid index). The index is
+    mapped the first time it's needed, and mapped anew (the old map closed) if it's since been rebuilt.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    index = _indexes.get(path)
+    if index is None or index.mtime != mtime:
+        if index is not None:
+            del _indexes[path]
+            index.close()
+        try:
+            index = _indexes[path] = Index(path)
+        except (OSError, ValueError, struct.error):
+            return None
+    return index.get(key)
+
+
+def write(path, mapping):
+    """Writes mapping, a dict of strings to strings, to path as an index, atomically."""
+    slots = 1
+    while slots < 2 * len(mapping):
+        slots *= 2
+    values = sorted(set(mapping.values()))
+
+    # the keys and values, after the slots and values' offsets, beginning with a NUL lest any key be at offset 0
+    base = _HEADER.size + slots * _SLOT.size + len(values) * _OFFSET.size
+    strings = bytearray(b"\0")
+
+    def intern(string):
+        offset = base + len(strings)
+        strings.extend(string.encode("utf-8") + b"\0")
+        return offset
+
+    offsets = [intern(value) for value in values]
+    table = [(0, 0)] * slots
+    positions = {value: _HEADER.size + slots * _SLOT.size + i * _OFFSET.size for i, value in enumerate(values)}
+    for key, value in sorted(mapping.items()):
+        i = zlib.crc32(key.encode("utf-8")) & (slots - 1)
+        while table[i][0]:
+            i = (i + 1) & (slots - 1)
+        table[i] = (intern(key), positions[value])
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+        f.write(_HEADER.pack(_MAGIC, slots, len(values)))
+        f.write(b"".join(_SLOT.pack(*slot) for slot in table))
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        f.write(strings)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
@@ -1,9 +1,12 @@
 import re
 
-from . import _common
+from . import _common, commands, fuzzy, paths
 
 from help50 import helper
 
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = (": No such file or directory", ": Not a directory", ": command not found", ": Permission denied")
+
 
 @helper("bash")
 def cd_no_such_file_or_directory(lines):
@@ -17,10 +20,12 @@ def cd_no_such_file_or_directory(lines):
     if not matches:
         return
 
-    response = [
-        "Are you sure `{}` exists?".format(matches.group(1)),
-        "Did you misspell `{}`?".format(matches.group(1))
-    ]
+    response = ["Are you sure `{}` exists?".format(matches.group(1))]
+    suggestions = paths.suggest(matches.group(1), directory=True)
+    if suggestions:
+        response.append("Did you mean {}?".format(fuzzy.alternatives(suggestions)))
+    else:
+        response.append("Did you misspell `{}`?".format(matches.group(1)))
 
     return lines[0:1], response
 
@@ -38,9 +43,13 @@ def cd_not_a_directory(lines):
         return
 
     response = [
-        "Looks like you're trying to change directories, but `{}` isn't a directory.".format(matches.group(1)),
-        "Did you mean to create the directory `{}` first?".format(matches.group(1))
+        "Looks like you're trying to change directories, but `{}` isn't a directory.".format(matches.group(1))
     ]
+    suggestions = paths.suggest(matches.group(1), directory=True)
+    if suggestions:
+        response.append("Did you mean to change into {}?".format(fuzzy.alternatives(suggestions)))
+    else:
+        response.append("Did you mean to create the directory `{}` first?".format(matches.group(1)))
 
     return lines[0:1], response
 
@@ -64,11 +73,13 @@ def command_not_found(lines):
     elif (matches.group(1) == "submit"):
         response = ["Did you mean to execute `submit50`?"]
     else:
-        response = [
-            "Are you sure `{}` exists?".format(matches.group(1)),
-            "Did you misspell `{}`?".format(matches.group(1)),
-            "Did you mean to execute `./{}`?".format(matches.group(1))
-        ]
+        response = ["Are you sure `{}` exists?".format(matches.group(1))]
+        suggestions = commands.suggest(matches.group(1))
+        if suggestions:
+            response.append("Did you mean to execute {}?".format(fuzzy.alternatives(suggestions)))
+        else:
+            response.append("Did you misspell `{}`?".format(matches.group(1)))
+            response.append("Did you mean to execute `./{}`?".format(matches.group(1)))
 
     return lines[0:1], response
 
@@ -85,11 +96,14 @@ def dot_slash_no_such_file_or_directory(lines):
     if not matches:
         return
 
-    response = [
-        "Are you sure `{}` exists?".format(matches.group(1)),
-        "Did you misspell `{}`?".format(matches.group(1)),
-        "Did you mean to execute `{}` instead of `./{}`?".format(matches.group(1), matches.group(1))
-    ]
+    response = ["Are you sure `{}` exists?".format(matches.group(1))]
+    suggestions = paths.suggest(matches.group(1))
+    if suggestions:
+        response.append("Did you mean to execute {}?".format(fuzzy.alternatives(
+            "./" + suggestion for suggestion in suggestions)))
+    else:
+        response.append("Did you misspell `{}`?".format(matches.group(1)))
+        response.append("Did you mean to execute `{}` instead of `./{}`?".format(matches.group(1), matches.group(1)))
 
     return lines[0:1], response
 
@@ -0,0 +1,47 @@
+"""
+Diagnoses many commands' output at once, across a pool of processes.
+"""
+import concurrent.futures
+import os
+
+from . import dispatch
+
+
+def diagnose(logs, workers=None, chunksize=None):
+    """
+    Returns a list of the diagnoses of logs, in the same order, wherein each log is a command's output or a
+    (domain, output) tuple, if its domain is already known, and each diagnosis is (before, after) or None.
+    Logs are diagnosed across workers processes (by default, one per CPU) in chunks of chunksize logs (by
+    default, enough for four chunks per worker). If workers is 1, logs are diagnosed in this process.
+
+      >>> [help and help[1][0] for help in diagnose([                        \
+              "make: 'foo' is up to date.",                                  \
+              ("bash", "bash: cd: foo: Not a directory"),                    \
+              ("make", "bash: cd: foo: Not a directory"),                    \
+              "Floating point exception (core dumped)"                       \
+          ], workers=2)]  # doctest: +NORMALIZE_WHITESPACE
+      ["Looks like you already compiled `foo` and haven't made any changes to `foo.c` since.",
+       "Looks like you're trying to change directories, but `foo` isn't a directory.",
+       None,
+       "Looks like somewhere in your program, you're trying to divide a number by 0."]
+    """
+    logs = list(logs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1 or len(logs) <= 1:
+        return [_diagnose(log) for log in logs]
+
+    if chunksize is None:
+        chunksize = max(1, -(-len(logs) // (workers * 4)))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_diagnose, logs, chunksize=chunksize))
+
+
+def _diagnose(log):
+    """Diagnoses a log, which is either output or a (domain, output) tuple."""
+    if isinstance(log, tuple):
+        domain, output = log
+        return dispatch.diagnose(output, [domain])
+    return dispatch.diagnose(log)
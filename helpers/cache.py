@@ -0,0 +1,117 @@
+"""
+Remembers which helper recognizes which messages, so that the same message in another file or on another line
+needn't be offered to every helper again.
+"""
+import collections
+import re
+
+from . import _common, dispatch
+
+# domains whose helpers recognize lines by their first CONTEXT lines alone, whereby the cache can be trusted
+DOMAINS = ("bash", "clang", "make")
+
+# how many lines, from the first, helpers inspect to decide whether they recognize a message (e.g., clang's
+# message, source line, caret, and fix-it), all of which key the cache
+CONTEXT = 4
+
+# the volatile parts of a line: clang's file, line, and column; bash's path and line
+_CLANG = re.compile(r"^[^:\s]+:\d+:\d+: ")
+_BASH = re.compile(r"^{}: (line \d+: )?".format(_common.BASH_PATH))
+
+
+class Cache:
+    """
+    A least-recently-used cache of which helper (if any) recognizes a message, keyed on the message with its
+    volatile parts normalized away, along with the lines after it that helpers inspect too (up to CONTEXT in all),
+    lest a helper that declined a message without them be skipped once they're there. On a hit, only that helper
+    is run, which renders its response with the message's actual file and line.
+
+      >>> cache = Cache(maxsize=2)
+      >>> cache.help("clang", ["foo.c:1:1: error: unknown type name 'string'"])[1][1]
+      'Did you forget `#include <cs50.h>` atop `foo.c`?'
+      >>> cache.help("clang", ["bar.c:28:5: error: unknown type name 'string'"])[1][1]
+      'Did you forget `#include <cs50.h>` atop `bar.c`?'
+      >>> cache.hits, cache.misses
+      (1, 1)
+      >>> message = "foo.c:5:12: error: format string is not a string literal (potentially insecure)"
+      >>> cache.help("clang", [message])[1][0]
+      'Not quite sure how to help, but focus your attention on line 5 of `foo.c`!'
+      >>> cache.help("clang", [message, "    printf(s);", "           ^"])[1][0]
+      'The first argument to `printf` on line 5 of `foo.c` should be a double-quoted string.'
+    """
+
+    def __init__(self, maxsize=1024, domains=DOMAINS):
+        self.maxsize = maxsize
+        self.domains = frozenset(domains)
+        self.hits = 0
+        self.misses = 0
+        self._helpers = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._helpers)
+
+    def help(self, domain, lines):
+        """Returns the response of the first of domain's helpers to match lines, if any."""
+        if domain not in self.domains:
+            return dispatch._help(domain, lines)
+
+        key = (domain, _normalize(lines[0]), tuple(lines[1:CONTEXT]))
+        try:
+            helper = self._helpers[key]
+        except KeyError:
+            pass
+        else:
+            self._helpers.move_to_end(key)
+            if helper is None:
+                self.hits += 1
+                return None
+
+            help = helper(lines)
+            if help:
+                self.hits += 1
+                return help
+
+        self.misses += 1
+        helper, help = dispatch._select(domain, lines)
+        self._helpers[key] = helper
+        self._helpers.move_to_end(key)
+        if len(self._helpers) > self.maxsize:
+            self._helpers.popitem(last=False)
+        return help
+
+    def clear(self):
+        """Empties the cache and resets its counters."""
+        self._helpers.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Returns the cache's counters, its size, and its hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._helpers),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def _normalize(line):
+    """
+    Normalizes away line's file, line, and column numbers (if a clang message) or path and line number (if
+    bash's).
+
+      >>> _normalize("foo.c:5:12: error: unused variable 'x'")
+      ":0:0: error: unused variable 'x'"
+      >>> _normalize("/bin/bash: line 3: foo: command not found")
+      'bash: line 0: foo: command not found'
+    """
+    if _CLANG.match(line):
+        return _CLANG.sub(":0:0: ", line, count=1)
+
+    matches = _BASH.match(line)
+    if matches:
+        return "bash: " + ("line 0: " if matches.group(1) else "") + line[matches.end():]
+
+    return line
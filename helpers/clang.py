@@ -1,7 +1,15 @@
 import collections
+import json
+import linecache
+import os
 import re
+import threading
+import urllib.parse
 
-from help50 import helper
+from help50 import HELPERS, helper, preprocessor
+
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("error: ", "warning: ", "undefined reference to `")
 
 
 @helper("clang")
@@ -19,7 +27,7 @@ def array_bounds(lines):
     if not matches:
         return
 
-    array = _caret_extract(lines[1:3])
+    array = _caret_extract(_parse(lines))
 
     if array:
         response = [
@@ -53,8 +61,8 @@ def array_subscript(lines):
     if not matches:
         return
 
-    array = _caret_extract(lines[1:3], left_aligned=False)
-    index = _tilde_extract(lines[1:3])
+    array = _caret_extract(_parse(lines), left_aligned=False)
+    index = _tilde_extract(_parse(lines))
 
     if array and index:
         response = [
@@ -170,7 +178,7 @@ def comp_str_literal_unspecified(lines):
         "If you need to compare two strings, try using the `strcmp` function declared in `string.h`."
     ]
 
-    if len(lines) >= 3 and _has_caret(lines[2]):
+    if _parse(lines).caret is not None:
         return lines[0:3], response
 
     return lines[0:1], response
@@ -195,16 +203,16 @@ def conflicting_types(lines):
             " line {} of `{}`.".format(matches.group[0], matches.line, matches.file)
     ]
 
-    if len(lines) >= 4:
-        prev_declaration = re.search(r"^([^:]+):(\d+):\d+: note: previous declaration is here", lines[3])
-        if prev_declaration:
-            if matches.file == prev_declaration.group(1):
-                response.append("You had already declared this function on line {}.".format(prev_declaration.group(2)))
-            else:
-                response.append("The function `{}` is already declared in the library {}. Try renaming your" \
-                    " function.".format(matches.group[0], prev_declaration.group(1).split('/')[-1]))
+    diagnostic = _parse(lines)
+    prev_declaration = diagnostic.note("previous declaration is here")
+    if prev_declaration:
+        if matches.file == prev_declaration.file:
+            response.append("You had already declared this function on line {}.".format(prev_declaration.line))
+        else:
+            response.append("The function `{}` is already declared in the library {}. Try renaming your" \
+                " function.".format(matches.group[0], prev_declaration.file.split('/')[-1]))
 
-            return lines[0:4], response
+        return lines[0:diagnostic.end], response
 
     return lines[0:1], response
 
@@ -297,11 +305,11 @@ def declaration_shadows_local_var(lines):
     # see if we can get the line number of the previous declaration of the variable
     prev_declaration_file = None
     prev_declaration_line = None
-    if len(lines) >= 4:
-        prev = re.search(r"^([^:]+):(\d+):\d+: note: previous declaration is here", lines[3])
-        if prev:
-            prev_declaration_line = prev.group(2)
-            prev_declaration_file = prev.group(1)
+    diagnostic = _parse(lines)
+    prev = diagnostic.note("previous declaration is here")
+    if prev:
+        prev_declaration_line = prev.line
+        prev_declaration_file = prev.file
 
     omit_suggestion = "If you meant to use the variable you've already declared previously"
     if prev_declaration_line and prev_declaration_file:
@@ -314,8 +322,8 @@ def declaration_shadows_local_var(lines):
     response.append("Otherwise, if you did mean to declare a new variable, try changing its name to a name that " \
                         "hasn't been used yet.")
 
-    if len(lines) >= 4 and prev_declaration_line != None:
-        return (lines[0:7], response) if len(lines) >= 6 and re.search(r"^\s*\^$", lines[5]) else (lines[0:4], response)
+    if prev:
+        return lines[0:diagnostic.end], response
 
     if len(lines) >= 2:
         return lines[0:2], response
@@ -388,11 +396,11 @@ def expected_closing_parens(lines):
     n = 1
 
     # if there's a note on which '(' to match, use that line number instead
-    if len(lines) >= 4:
-        parens_match = re.search(r"^([^:]+):(\d+):\d+: note: to match this '\('", lines[3])
-        if parens_match:
-            match_line = parens_match.group(2)
-            n = 4
+    diagnostic = _parse(lines)
+    parens_match = diagnostic.note("to match this '('")
+    if parens_match:
+        match_line = parens_match.line
+        n = diagnostic.end
 
     response = [
         "Make sure that all opening parentheses `(` are matched with a closing parenthesis" \
@@ -673,7 +681,7 @@ def extraneous_closing_parens(lines):
             "the semicolon.".format(matches.line, matches.file)
     ]
 
-    if len(lines) >= 3 and _has_caret(lines[2]):
+    if _parse(lines).caret is not None:
         return lines[0:3], response
 
     return lines[0:1], response
@@ -807,7 +815,7 @@ def ignoring_return_value(lines):
     if not matches:
         return
 
-    function = _caret_extract(lines[1:3])
+    function = _caret_extract(_parse(lines))
     if function:
         response = [
             "You seem to be calling `{}` on line {} of `{}` but aren't using its " \
@@ -847,6 +855,7 @@ def implicit_declaration_of_fun(lines):
             "`{}`.".format(matches.group[0], matches.group[0])
     ]
 
+    header = _header(matches.group[0])
     if matches.group[0] in ["get_char", "get_double", "get_float", "get_int", "get_long", "get_long_long",
                             "get_string", "GetChar", "GetDouble", "GetFloat", "GetInt", "GetLong", "GetLongLong",
                             "GetString"]:
@@ -858,6 +867,9 @@ def implicit_declaration_of_fun(lines):
         response.append("Do you have `#define _XOPEN_SOURCE` above, not below, `#include <unistd.h>`?")
     elif matches.group[0] in ["eprintf"]:
         response.append("The function `eprintf` has been deprecated and is thus no longer part of the CS50 library.")
+    elif header:
+        response.append("Did you forget to `#include <{}>` (in which `{}` is declared) atop " \
+            "your file?".format(header, matches.group[0]))
     else:
         response.append("Did you forget to `#include` the header file in which `{}` is declared atop " \
             "your file?".format(matches.group[0]))
@@ -884,10 +896,14 @@ def implicitly_declaring_lib_fun(lines):
     if not matches:
         return
 
+    header = _header(matches.group[0])
     if matches.group[0] in ["printf"]:
         response = ["Did you forget to `#include <stdio.h>` (in which `printf` is declared) atop your file?"]
     elif matches.group[0] in ["malloc"]:
         response = ["Did you forget to `#include <stdlib.h>` (in which `malloc` is declared) atop your file?"]
+    elif header:
+        response = ["Did you forget to `#include <{}>` (in which `{}` is declared) atop " \
+            "your file?".format(header, matches.group[0])]
     else:
         response = ["Did you forget to `#include` the header file in which `{}` is declared atop " \
             "your file?".format(matches.group[0])]
@@ -1049,7 +1065,7 @@ def main_must_return_int(lines):
             "type `int`.".format(matches.line, matches.file)
     ]
 
-    cur_type = _caret_extract(lines[1:3])
+    cur_type = _caret_extract(_parse(lines))
     if len(lines) >= 3 and cur_type:
         response.append("Right now, it has a return type of `{}`.".format(cur_type))
 
@@ -1072,7 +1088,7 @@ def missing_parens(lines):
     if not matches:
         return
 
-    function = _tilde_extract(lines[1:3])
+    function = _tilde_extract(_parse(lines))
     if function:
         response = [
             "Looks like you're trying to call `{}` on line {} of `{}`, but did you forget parentheses after the" \
@@ -1191,7 +1207,7 @@ def relational_comp_res_unused(lines):
             "result?".format(matches.line, matches.file)
     ]
 
-    if len(lines) >= 3 and _has_caret(lines[2]):
+    if _parse(lines).caret is not None:
         return lines[0:3], response
 
     return lines[0:1], response
@@ -1283,7 +1299,7 @@ def too_many_args_to_fun_call(lines):
     if not matches:
         return
 
-    function = _tilde_extract(lines[1:3]) if len(lines) >= 3 else None
+    function = _tilde_extract(_parse(lines))
 
     response = [
         "You seem to be passing in too many arguments to a function on line {} of `{}`.".format(matches.line, matches.file)
@@ -1363,6 +1379,7 @@ def undefined_reference(lines):
                 "against the file that implements `{}`.".format(matches.group[0])
         ]
 
+        library = _library(matches.group[0])
         if matches.group[0] in ["get_char", "get_double", "get_float", "get_int", "get_long", "get_long_long",
                                 "get_string"]:
             response.append("Did you forget to compile with `-lcs50` in order to link against against the CS50 Library, " \
@@ -1373,6 +1390,9 @@ def undefined_reference(lines):
         elif matches.group[0] == "crypt":
             response.append("Did you forget to compile with -lcrypt in order to link against the crypto library, " \
                 "which implemens `crypt`?")
+        elif library:
+            response.append("Did you forget to compile with `-l{0}` in order to link against `lib{0}`, which " \
+                "implements `{1}`?".format(library, matches.group[0]))
         else:
             response.append("Did you forget to compile with `-lfoo`, where `foo` is the library that defines " \
                 "`{}`?".format(matches.group[0]))
@@ -1399,7 +1419,7 @@ def unknown_escape_sequence(lines):
             "shouldn't.".format(matches.line, matches.file)
     ]
 
-    if len(lines) >= 3 and _has_caret(lines[2]):
+    if _parse(lines).caret is not None:
         response.append("Did you mean to escape some character?")
         return lines[0:3], response
 
@@ -1565,7 +1585,7 @@ def void_return(lines):
     if not matches:
         return
 
-    value = _tilde_extract(lines[1:3])
+    value = _tilde_extract(_parse(lines))
 
     if len(lines) >= 3 and value:
         response = [
@@ -1614,23 +1634,64 @@ def catch_all(lines):
     return lines[0:1], response
 
 
+@preprocessor("clang")
+def structured_diagnostics(output):
+    """
+    Renders diagnostics emitted as JSON (per -fdiagnostics-format=json) or SARIF (per -fdiagnostics-format=sarif)
+    as clang's usual text, one line per message, with the source line and caret if the source can be read.
+    Any other output is returned as is.
+
+      >>> print(structured_diagnostics('''[{"kind": "error", "message": "unknown type name 'string'",
+      ...     "locations": [{"caret": {"file": "nonexistent.c", "line": 3, "column": 5}}]}]'''))
+      nonexistent.c:3:5: error: unknown type name 'string'
+      >>> print(structured_diagnostics('''{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "runs": [{
+      ...     "results": [{"level": "error", "message": {"text": "expected ';' after expression"},
+      ...         "locations": [{"physicalLocation": {"artifactLocation": {"uri": "file:///nonexistent/foo.c"},
+      ...             "region": {"startLine": 5, "startColumn": 24}}}]}]}], "version": "2.1.0"}
+      ... 1 error generated.'''))
+      /nonexistent/foo.c:5:24: error: expected ';' after expression
+      1 error generated.
+      >>> structured_diagnostics("foo.c:1:1: error: unknown type name 'bar'")
+      "foo.c:1:1: error: unknown type name 'bar'"
+    """
+    # a quick check for any such document, lest every other output be searched line by line
+    if '"kind"' not in output and '"runs"' not in output:
+        return output
+
+    matches = _STRUCTURED.search(output)
+    if not matches:
+        return output
+
+    try:
+        document, end = json.JSONDecoder().raw_decode(output, matches.start(1))
+    except ValueError:
+        return output
+
+    if isinstance(document, dict):
+        lines = _from_sarif(document)
+    else:
+        lines = _from_json(document)
+
+    return "\n".join([output[:matches.start(1)].rstrip("\n")] + lines + [output[end:].lstrip("\n")]).strip("\n")
+
+
 # HELPERS FOR THE HELPERS
 
-def _caret_extract(lines, left_aligned=True):
+def _caret_extract(diagnostic, left_aligned=True):
     """
     Extract the name of a variable above the ^ by default, assumes that ^ is
     under the first character of the variable.
     If left_aligned is set to False, ^ is under the next character after the variable
     """
-    if len(lines) < 2 or not _has_caret(lines[1]):
+    if not diagnostic or diagnostic.caret is None:
         return
 
-    index = lines[1].index("^")
+    index = diagnostic.caret
 
     if left_aligned:
-        matches = re.match(r"^([A-Za-z0-9_]+)", lines[0][index:])
+        matches = re.match(r"^([A-Za-z0-9_]+)", diagnostic.source[index:])
     else:
-        matches = re.match(r"^.*?([A-Za-z0-9_]+)$", lines[0][:index])
+        matches = re.match(r"^.*?([A-Za-z0-9_]+)$", diagnostic.source[:index])
 
     return matches.group(1) if matches else None
 
@@ -1639,8 +1700,202 @@ def _has_caret(line):
     return bool(re.search(r"^[ ~]*\^[ ~]*$", line))
 
 
+def _header(symbol):
+    """
+    Returns the header that declares symbol, per headers' index, else None, as it does if that index (or the
+    modules that read it) can't be loaded, as under help50's loader.
+    """
+    try:
+        from . import headers
+    except ImportError:
+        return None
+    return headers.header(symbol)
+
+
+def _library(symbol):
+    """
+    Returns the library that defines symbol, unless one against which every program is linked anyway, per
+    libraries' index, else None, as it does if that index (or the modules that read it) can't be loaded.
+    """
+    try:
+        from . import libraries
+    except ImportError:
+        return None
+    library = libraries.library(symbol)
+    return library if library not in libraries.IMPLICIT else None
+
+
+class _Diagnostic:
+    """
+    One of clang's diagnostics, parsed once: where it is, what it says, the source line it quotes, the columns
+    its caret and tildes mark, and any notes attached to it. span is how many lines the diagnostic itself spans,
+    end how many it and its notes span.
+
+      >>> diagnostic = _parse([                                                                    \
+              "foo.c:6:13: error: declaration shadows a local variable [-Werror,-Wshadow]",        \
+              "        int x = 28;",                                                               \
+              "            ^",                                                                     \
+              "foo.c:5:9: note: previous declaration is here",                                     \
+              "    int x = get_int(\\"x: \\");",                                                \
+              "        ^",                                                                         \
+              "1 error generated."                                                                 \
+          ])
+      >>> diagnostic.severity, diagnostic.message, diagnostic.flag, diagnostic.caret
+      ('error', 'declaration shadows a local variable', '-Werror,-Wshadow', 12)
+      >>> [(note.line, note.message) for note in diagnostic.notes], diagnostic.span, diagnostic.end
+      ([('5', 'previous declaration is here')], 3, 6)
+    """
+
+    __slots__ = ("file", "line", "column", "severity", "message", "flag", "source", "caret", "tildes", "notes",
+                 "span", "end")
+
+    def __init__(self, file, line, column, severity, message, flag):
+        self.file = file
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+        self.flag = flag
+        self.source = None
+        self.caret = None
+        self.tildes = []
+        self.notes = []
+        self.span = 1
+        self.end = 1
+
+    def note(self, message):
+        """Returns the first note whose message starts with message, if any."""
+        for note in self.notes:
+            if note.message.startswith(message):
+                return note
+
+
+# every diagnostic's (or note's) first line, with its flag (if any) apart from its message
+_DIAGNOSTIC = re.compile(r"^([^:\s]+):(\d+):(\d+): (warning|note|(?:fatal |runtime )?error): (.*?)"
+                         r"(?: \[(-W[^\]]*)\])?$", re.DOTALL)
+
+# a line beneath a quoted source line, marking columns thereof with ^ and ~
+_MARKER = re.compile(r"^[ ~^]*[~^][ ~^]*$")
+
+# each thread's most recently parsed lines and their diagnostic, lest every helper reparse them
+_parsed = threading.local()
+
+
+def _parse(lines):
+    """Returns the diagnostic atop lines, with its notes, or None if lines[0] isn't one of clang's diagnostics."""
+    if getattr(_parsed, "lines", None) is lines:
+        return _parsed.diagnostic
+
+    diagnostic = _tokenize(lines, 0)
+    if diagnostic:
+        while diagnostic.end < len(lines):
+            note = _tokenize(lines, diagnostic.end)
+            if not note or note.severity != "note":
+                break
+            diagnostic.notes.append(note)
+            diagnostic.end += note.span
+
+    _parsed.lines, _parsed.diagnostic = lines, diagnostic
+    return diagnostic
+
+
+def _tokenize(lines, start):
+    """Returns the diagnostic (sans notes) at lines[start], whose end is the index just past its last line."""
+    matches = _DIAGNOSTIC.search(lines[start])
+    if not matches:
+        return
+
+    diagnostic = _Diagnostic(*matches.groups())
+    if len(lines) > start + 2 and _MARKER.search(lines[start + 2]):
+        diagnostic.source = lines[start + 1]
+        marker = lines[start + 2]
+        if _has_caret(marker):
+            diagnostic.caret = marker.index("^")
+        diagnostic.tildes = [tildes.span() for tildes in re.finditer("~+", marker)]
+        diagnostic.span = 3
+
+    diagnostic.end = start + diagnostic.span
+    return diagnostic
+
+
+def _from_json(diagnostics):
+    """Renders diagnostics, as emitted per -fdiagnostics-format=json, as text."""
+    lines = []
+    for diagnostic in diagnostics:
+        locations = diagnostic.get("locations") or [{}]
+        caret = locations[0].get("caret", {})
+        finish = locations[0].get("finish", caret)
+        lines.extend(_render(caret.get("file"), caret.get("line"), caret.get("column"), finish.get("column"),
+                             diagnostic.get("kind", "error"), diagnostic.get("message", ""), diagnostic.get("option")))
+        lines.extend(_from_json(diagnostic.get("children", [])))
+    return lines
+
+
+def _from_sarif(document):
+    """Renders the results in document, as emitted per -fdiagnostics-format=sarif, as text."""
+    lines = []
+    for run in document.get("runs", []):
+        for result in run.get("results", []):
+            level = result.get("level", "warning")
+            for i, location in enumerate(result.get("locations", [])[:1] + result.get("relatedLocations", [])):
+                physical = location.get("physicalLocation", {})
+                region = physical.get("region", {})
+                message = (location if i else result).get("message", {}).get("text", "")
+                path = urllib.parse.unquote(urllib.parse.urlparse(physical.get("artifactLocation", {}).get("uri", ""))
+                                            .path)
+                lines.extend(_render(path, region.get("startLine"), region.get("startColumn"),
+                                     region.get("endColumn", 0) - 1 if "endColumn" in region else None,
+                                     "note" if i else level, message, None))
+    return lines
+
+
+def _render(path, line, column, finish, severity, message, flag):
+    """Renders one diagnostic as clang would, with the source line and a caret beneath column, and tildes through
+    finish, if path can be read and is within the current directory, lest output name some other file (e.g.,
+    /etc/passwd) whose lines a server (e.g., helpers.server) would otherwise disclose. The source is cached per
+    absolute path, and read anew once changed, lest a long-lived process render another directory's (or an
+    older) file of the same name.
+
+    >>> _render("/etc/passwd", 1, 1, None, "error", "expected ';'", None)
+    ["/etc/passwd:1:1: error: expected ';'"]
+    """
+    source = ""
+    if path and line:
+        absolute = os.path.realpath(path)
+        if absolute.startswith(os.path.join(os.path.realpath(os.curdir), "")):
+            linecache.checkcache(absolute)
+            source = linecache.getline(absolute, line).rstrip("\n")
+
+    if path and os.path.isabs(path):
+        relative = os.path.relpath(path)
+        if not relative.startswith(os.pardir):
+            path = relative
+
+    header = "{}:{}:{}: {}: {}".format(path, line, column, severity, " ".join(message.split()))
+    if flag:
+        header += " [{}]".format(flag)
+
+    if not source or not column:
+        return [header]
+
+    marker = " " * (column - 1) + "^" + "~" * max((finish or column) - column, 0)
+    return [header, source, marker]
+
+
 _ClangMatch = collections.namedtuple("_ClangMatch", ["file", "line", "group"])
 
+# clang's prefix for every error or warning, i.e., file:line:column: severity:
+_HEADER = r"^([^:\s]+):(\d+):\d+: (?:warning|(?:fatal |runtime )?error): "
+
+# the message itself, minus any trailing [-Wflag]
+_MESSAGE = re.compile(_HEADER + r"(.*?)(?: \[-W[^\]]*\])?$", re.DOTALL)
+
+# the start of a JSON or SARIF document, at the start of a line
+_STRUCTURED = re.compile(r'^[ \t]*(\{\s*"(?:\$schema|runs|version)"|\[\s*\{\s*"kind")', re.MULTILINE)
+
+# compiled queries, keyed on (expression, raw)
+_QUERIES = {}
+
 
 def _match(expression, line, raw=False):
     """
@@ -1649,8 +1904,20 @@ def _match(expression, line, raw=False):
     The second capture group is the line number associated with the message.
     set raw=True to search for a message that doesn't follow clang's typical error output format.
     """
-    query = expression if raw else fr"^([^:\s]+):(\d+):\d+: (?:warning|(?:fatal |runtime )?error): {expression}"
-    matches = re.search(query, line)
+    if _probing is not None:
+        _probing.append((expression, raw))
+        return None
+
+    # skip the regex altogether if the index rules out this expression for this line
+    if not raw and _index is not None and expression not in _index.candidates(line):
+        return None
+
+    try:
+        query = _QUERIES[expression, raw]
+    except KeyError:
+        query = _QUERIES[expression, raw] = re.compile(expression if raw else _HEADER + expression)
+
+    matches = query.search(line)
 
     if not matches:
         return None
@@ -1663,16 +1930,165 @@ def _match(expression, line, raw=False):
                        group=matches.groups()[2:])
 
 
-def _tilde_extract(lines):
+def _message(line):
+    """
+    Returns the message of a clang error or warning (i.e., what follows "error:" or "warning:"), minus
+    any trailing [-Wflag], or None if line isn't an error or warning.
+
+      >>> _message("foo.c:5:12: error: unused variable 'x' [-Werror,-Wunused-variable]")
+      "unused variable 'x'"
+    """
+    matches = _MESSAGE.search(line)
+    if not matches:
+        return None
+    return matches.group(3)
+
+
+def _prefix(expression):
+    """
+    Returns the literal text with which any match of expression must begin.
+
+      >>> _prefix(r"expected '\\)'")
+      "expected ')'"
+      >>> _prefix(r"control (may )?reach(es)? end of non-void function")
+      'control '
+      >>> _prefix(r"extraneous closing brace \\('}'\\)")
+      "extraneous closing brace ('}')"
+    """
+    prefix = ""
+    i = 0
+    while i < len(expression):
+        c = expression[i]
+        if c == "\\":
+            if i + 1 == len(expression) or expression[i+1].isalnum():
+                break
+            c = expression[i+1]
+            i += 1
+        elif c in ".^$*+?{[]|()":
+            break
+        i += 1
+
+        # a quantified character is optional
+        if i < len(expression) and expression[i] in "*?{":
+            break
+        prefix += c
+    return prefix
+
+
+class _Index:
+    """
+    Maps a diagnostic's message to the expressions that could possibly match it, via a hash on the message's
+    first word and a check of each expression's literal prefix. Expressions without a complete first word
+    (e.g., ".*") are candidates for every message.
+    """
+
+    def __init__(self, expressions):
+        self._words = collections.defaultdict(list)
+        self._wildcards = set()
+        for expression in expressions:
+            prefix = _prefix(expression)
+            if " " in prefix:
+                self._words[prefix.split(" ", 1)[0]].append((prefix, expression))
+            else:
+                self._wildcards.add(expression)
+
+        # each thread's most recent line and its candidates, since every helper asks about the same line in turn
+        self._recent = threading.local()
+
+    def candidates(self, line):
+        """Returns the set of expressions that might match line."""
+        recent = getattr(self._recent, "candidates", None)
+        if recent is not None and recent[0] == line:
+            return recent[1]
+
+        message = _message(line)
+        if message is None:
+            candidates = frozenset()
+        else:
+            candidates = frozenset(expression for prefix, expression in self._words.get(message.split(" ", 1)[0], [])
+                                   if message.startswith(prefix)) | self._wildcards
+
+        self._recent.candidates = (line, candidates)
+        return candidates
+
+
+def _build_index():
+    """
+    Learns which expressions each of this module's helpers passes to _match by calling each helper once while
+    _match records (rather than evaluates) its arguments. Returns a map from each expression to the positions
+    in HELPERS["clang"] of the helpers that use it (with None for those that must always be tried) and an
+    index of those expressions. Helpers that pass _match nothing (or raise) when probed, and so might match
+    otherwise, are always tried too, though only those whose expressions are raw should be:
+
+      >>> positions, index = _build_index()
+      >>> [HELPERS["clang"][i].__name__ for i in sorted(positions.get(None, ()))]
+      ['undefined_reference']
+    """
+    global _probing
+
+    positions = collections.defaultdict(set)
+    _probing = []
+    try:
+        for i, func in enumerate(HELPERS["clang"]):
+            if func.__module__ != __name__:
+                positions[None].add(i)
+                continue
+            del _probing[:]
+            try:
+                func([""])
+            except Exception:
+                del _probing[:]
+            if not _probing:
+                positions[None].add(i)
+            for expression, raw in _probing:
+                positions[None if raw else expression].add(i)
+    finally:
+        _probing = None
+
+    return dict(positions), _Index(expression for expression in positions if expression is not None)
+
+
+def _candidates(line):
+    """
+    Returns those of the clang helpers (in order of registration) whose expressions the index deems
+    candidates for line. Helpers are looked up in HELPERS["clang"] anew each time, lest any be wrapped.
+    """
+    positions = set(_positions.get(None, ()))
+    for expression in _index.candidates(line):
+        positions.update(_positions[expression])
+    helpers = HELPERS["clang"]
+    return [helpers[i] for i in sorted(positions)]
+
+
+def _dispatch(lines):
+    """
+    Returns the response of the first of this module's helpers (in order of registration) to match lines,
+    running only those helpers whose expressions the index deems candidates for lines[0].
+
+      >>> _dispatch(["foo.c:1:1: error: unknown type name 'string'"])[1][1]
+      'Did you forget `#include <cs50.h>` atop `foo.c`?'
+      >>> _dispatch(["foo.c:28:28: error: expected expression"])[1][0]
+      'Not quite sure how to help, but focus your attention on line 28 of `foo.c`!'
+      >>> _dispatch(["hello, world"]) is None
+      True
+    """
+    for helper in _candidates(lines[0]):
+        help = helper(lines)
+        if help:
+            return help
+
+
+def _tilde_extract(diagnostic):
     """Extracts all characters above the first sequence of ~."""
-    if len(lines) < 2 or not re.search("~", lines[1]):
+    if not diagnostic or not diagnostic.tildes:
         return
 
-    start = lines[1].index("~")
-    length = 1
+    start, end = diagnostic.tildes[0]
+    if len(diagnostic.source) >= end:
+        return diagnostic.source[start:end]
+
 
-    while len(lines[1]) > start + length and lines[1][start + length] == "~":
-        length += 1
+# set to a list while _build_index is learning each helper's expressions
+_probing = None
 
-    if len(lines[0]) >= start + length:
-        return lines[0][start:start+length]
+_positions, _index = _build_index()
@@ -0,0 +1,79 @@
+"""
+Asks a helpers.server for help with a command's output, without importing any helpers itself.
+
+Usage: some_command 2>&1 | python3 -m helpers.client [--socket PATH] [DOMAIN ...]
+
+Prints the lines explained and the help, much as helpers.stream does, and exits with 0 if there was help, 1 if
+not, or 2 if the server couldn't be reached (whereupon a wrapper might diagnose the output itself).
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+# where this user's server listens, unless told otherwise, each user's server answering only that user
+SOCKET = os.environ.get("HELP50_SOCKET") or "/tmp/help50-{}.sock".format(os.getuid())
+
+# how long to wait, in seconds, for the server to connect and to respond
+TIMEOUT = 10
+
+
+def request(output, path=SOCKET, domains=None, timeout=TIMEOUT):
+    """
+    Returns (before, after) for output, per the server listening at path, else None, trying only domains, if
+    given. The server diagnoses output in this process's working directory and with its $PATH, lest it suggest
+    paths and commands of its own. Raises OSError if the server can't be reached (or this process's working
+    directory no longer exists) and RuntimeError if it fails to diagnose output.
+    """
+    request = {"output": output, "domains": domains, "cwd": os.getcwd(), "PATH": os.environ.get("PATH", os.defpath)}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        with sock.makefile("rwb") as stream:
+            stream.write(encode(request))
+            stream.flush()
+            line = stream.readline()
+
+    if not line:
+        raise RuntimeError("server closed connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["help"] and tuple(response["help"])
+
+
+def encode(message):
+    """
+    Encodes message as a line of JSON, the protocol's only framing.
+
+      >>> encode({"output": "foo\\nbar"})
+      b'{"output": "foo\\\\nbar"}\\n'
+    """
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asks a helpers.server for help with output from stdin.")
+    parser.add_argument("-s", "--socket", default=SOCKET, help="the server's socket")
+    parser.add_argument("domains", nargs="*", help="domains to try (by default, as routed)")
+    args = parser.parse_args()
+
+    try:
+        help = request(sys.stdin.read(), args.socket, args.domains or None)
+    except (OSError, RuntimeError) as e:
+        print("help50: {}".format(e), file=sys.stderr)
+        return 2
+
+    if not help:
+        return 1
+
+    before, after = help
+    print("\n".join(before))
+    print()
+    print(" ".join(after))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
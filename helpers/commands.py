@@ -0,0 +1,112 @@
+"""
+Suggests, for a command that wasn't found, the executables on $PATH (or in the current directory) whose names are
+nearest it. A long-lived process (e.g., helpers.server) can instead warm an index of those names that's built
+once and built anew only once some directory has changed (as evidenced by its mtime), so that suggesting costs
+but a stat of each directory, not a walk of $PATH. Building that index costs more than a walk, though, so a
+process that suggests but once (e.g., help50's own) just compares the command with each name.
+"""
+import os
+
+from . import fuzzy
+
+# how many executables to suggest, at most
+LIMIT = 3
+
+# each index built thus far, with its directories' mtimes, keyed on its directories
+_indexes = {}
+
+# whether to search indexes, per warm, rather than compare commands with each executable's name
+_indexing = False
+
+
+def suggest(command, path=None, limit=LIMIT):
+    """
+    Returns the names of the executables in path (by default, $PATH) or the current directory (prefixed with ./)
+    nearest command, as many as limit, among those equally near, if any are near at all.
+
+      >>> import stat, tempfile
+      >>> directory = tempfile.mkdtemp()
+      >>> for name in ("check50", "style50", "README"):
+      ...     open(os.path.join(directory, name), "w").close()
+      >>> for name in ("check50", "style50"):
+      ...     os.chmod(os.path.join(directory, name), stat.S_IRWXU)
+      >>> suggest("chek50", path=directory), suggest("READM", path=directory), suggest("style", path=directory)
+      (['check50'], [], [])
+    """
+    if not command or "/" in command:
+        return []
+
+    suggestions = []
+    for prefix, directories in (("./", (os.curdir,)), ("", _directories(path))):
+        for d, name in _search(command, directories):
+            if d or prefix:
+                suggestions.append((d, prefix + name))
+    suggestions.sort()
+    return [name for d, name in suggestions if d == suggestions[0][0]][:limit]
+
+
+def warm(path=None):
+    """
+    Indexes the executables in path (by default, $PATH), and searches indexes rather than each executable's
+    name henceforth, as befits a process that will suggest again and again.
+    """
+    global _indexing
+    _indexing = True
+    index(_directories(path))
+
+
+def index(directories):
+    """Returns an index of the executables in directories, built anew if any of them has changed since last built."""
+    mtimes = tuple(_mtime(directory) for directory in directories)
+    key = tuple(os.path.abspath(directory) for directory in directories)
+    try:
+        built, index = _indexes[key]
+    except KeyError:
+        built = index = None
+    if built != mtimes:
+        index = fuzzy.Index(executables(directories))
+        _indexes[key] = (mtimes, index)
+    return index
+
+
+def executables(directories):
+    """Returns the names of the executable files in directories."""
+    names = set()
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return names
+
+
+# HELPERS FOR THE HELPERS
+
+def _directories(path=None):
+    """Returns the directories in path (by default, $PATH)."""
+    path = os.environ.get("PATH", os.defpath) if path is None else path
+    return tuple(filter(None, path.split(os.pathsep)))
+
+
+def _search(command, directories):
+    """
+    Returns [(distance, name)] for each executable in directories near command, nearest first, per their index
+    if warmed, else by measuring command's distance to each name (as near in length as could be near at all).
+    """
+    if _indexing:
+        return index(directories).search(command)
+    return fuzzy.scan(command, executables(directories))
+
+
+def _mtime(directory):
+    """Returns directory's mtime, else None if it doesn't exist."""
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
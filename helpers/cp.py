@@ -4,6 +4,9 @@ from . import _common
 
 from help50 import helper
 
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("cp: overwrite ‘",)
+
 
 @helper("cp")
 def overwrite(lines):
@@ -0,0 +1,251 @@
+"""
+Diagnoses a command's output with the helpers registered with help50, much as help50 itself does.
+"""
+import re
+
+from help50 import HELPERS, PREPROCESSORS
+
+from . import DOMAINS, _common, load, load_all, prefilter
+
+_ANSI = re.compile(_common.ANSI)
+
+# the first line of a block of output that can be diagnosed on its own, i.e., one of clang's errors or warnings
+# (but not its notes, which belong to the block before), a line of make's, or a header's chain of inclusion
+_BLOCK = re.compile("{}|{}".format(_common.CLANG, _common.MAKE))
+_INCLUDED = "In file included from "
+
+# a compiler's command line, as echoed by make, which begins a block along with the diagnostic after it
+_COMMAND = re.compile(r"^(?:clang|cc|gcc) ")
+
+# the domains whose helpers might recognize output, keyed on the name of the group that matches output's first line
+_ROUTES = {
+    "valgrind": ("valgrind",),
+    "xml": ("valgrind",),
+    "runtime": ("runtime",),
+    "clang": ("clang",),
+    "linker": ("clang",),
+    "structured": ("clang",),
+    "compiler": ("clang", "make"),
+    "make": ("make",),
+    "bash": ("bash",),
+    "cp": ("cp",),
+    "ls": ("ls",),
+    "mv": ("mv",),
+    "rm": ("rm",)
+}
+
+# the first line of output from each of _ROUTES, whereby to tell (without trying any helpers) whence output came
+_ROUTER = re.compile("|".join([
+    r"(?P<valgrind>==\d+== )",
+    r"(?P<xml><\?xml|<valgrindoutput)",
+    r"(?P<runtime>.*(?:Segmentation fault|Floating point exception))",
+    r"(?P<clang>{})".format(_common.CLANG[1:]),
+    r"(?P<linker>(?:[^:\s]+:\(\.\w+\+0x[0-9a-f]+\)|{}(?:ld|clang)): )".format(_common.FILE_PATH),
+    r"(?P<structured>\[\s*\{\s*\"kind\"|\{\s*\"(?:\$schema|runs|version)\")",
+    r"(?P<compiler>(?:clang|cc|gcc) )",
+    r"(?P<make>{})".format(_common.MAKE[1:]),
+    r"(?P<bash>{}: )".format(_common.BASH_PATH),
+    r"(?P<cp>{}cp: )".format(_common.FILE_PATH),
+    r"(?P<ls>{}ls: )".format(_common.FILE_PATH),
+    r"(?P<mv>{}mv: )".format(_common.FILE_PATH),
+    r"(?P<rm>{}rm: )".format(_common.FILE_PATH)
+]))
+
+# each domain's module's _candidates function, or None if it has none, keyed on domain
+_CANDIDATES = {}
+
+
+def diagnose(output, domains=None, cache=None):
+    """
+    Returns (before, after) for the first helper to recognize output, trying each of domains (or, by default,
+    those to which output's first line is routed, then every other domain) in turn, else None. If cache (a
+    helpers.cache.Cache) is given, helpers are selected through it. Domains' modules are loaded as needed.
+
+      >>> diagnose("bash: foo: command not found")[1][0]
+      'Are you sure `foo` exists?'
+      >>> diagnose("\\x1b[1mfoo.c:1:1: \\x1b[0;1;31merror: \\x1b[0munknown type name 'bar'", ["clang"])[0]
+      ["foo.c:1:1: error: unknown type name 'bar'"]
+      >>> diagnose("bash: foo: command not found", ["make"]) is None
+      True
+
+    Routing only orders domains, so output whose first line is (e.g.) make's, though its errors are clang's, is
+    diagnosed as if every domain were tried.
+
+      >>> logs = ["\\n".join([preamble,
+      ...                      "clang -ggdb3 -O0 -std=c11 -Wall -Werror -Wshadow mario.c -lcs50 -lm -o mario",
+      ...                      "mario.c:5:5: error: unknown type name 'string'",
+      ...                      "    string s = get_string(\\"Height: \\");",
+      ...                      "    ^",
+      ...                      "1 error generated.",
+      ...                      "make: *** [<builtin>: mario] Error 1"])
+      ...         for preamble in ["make: Warning: File 'mario.c' has modification time 2.1 s in the future",
+      ...                          "make: Entering directory '/home/ubuntu/pset1/mario'",
+      ...                          "make[1]: Entering directory '/home/ubuntu/pset1/mario'"]]
+      >>> {diagnose(log)[1][1] for log in logs}
+      {'Did you forget `#include <cs50.h>` atop `mario.c`?'}
+      >>> all(diagnose(log) == diagnose(log, _domains()) for log in logs)
+      True
+    """
+    output = _ANSI.sub("", output)
+
+    for domain in domains or _routed(output):
+        load(domain)
+        processed = output
+        for preprocessor in PREPROCESSORS.get(domain, []):
+            processed = preprocessor(processed)
+        if not prefilter.admits(domain, processed):
+            continue
+        lines = processed.splitlines()
+
+        for i in range(len(lines)):
+            help = cache.help(domain, lines[i:]) if cache is not None else _help(domain, lines[i:])
+            if help:
+                return help
+
+
+def diagnose_all(output, domains=None, cache=None):
+    """
+    Returns a list of (before, after), in order, for every block of output that a helper recognizes, trying each
+    of domains (or, by default, those to which the block's first line is routed, then the rest) in turn, as
+    diagnose does. Output is split into blocks, one per diagnostic, in a single pass, and each block is diagnosed
+    once, so a log with hundreds of errors costs little more than hundreds of logs with one.
+
+      >>> [help[0][0] for help in diagnose_all("\\n".join([                             \
+              "clang -ggdb3 -O0 -std=c11 -Wall -Werror -Wshadow foo.c -lcs50 -lm -o foo", \
+              "foo.c:1:1: error: unknown type name 'bar'",                                \
+              "bar x;",                                                                   \
+              "^",                                                                        \
+              "foo.c:5:5: error: use of undeclared identifier 'y'",                       \
+              "    y++;",                                                                 \
+              "    ^",                                                                    \
+              "2 errors generated.",                                                      \
+              "make: *** [<builtin>: foo] Error 1"                                        \
+          ]), ["clang"])]
+      ["foo.c:1:1: error: unknown type name 'bar'", "foo.c:5:5: error: use of undeclared identifier 'y'"]
+    """
+    output = _ANSI.sub("", output)
+
+    everywhere = domains or _domains()
+    for domain in everywhere:
+        load(domain)
+        for preprocessor in PREPROCESSORS.get(domain, []):
+            output = preprocessor(output)
+    lines = output.splitlines()
+
+    diagnoses = []
+    for start, end in _blocks(lines):
+        block = lines[start:end]
+        help = _diagnose_block(block, domains or _routed(block[0], everywhere), cache)
+        if help:
+            diagnoses.append(help)
+    return diagnoses
+
+
+def route(output):
+    """
+    Returns the domains whose helpers might recognize output, per its first line alone, or None if its first line
+    doesn't reveal whence output came, in which case any domain's might.
+
+      >>> route("make: *** No rule to make target 'foo'.  Stop.")
+      ('make',)
+      >>> route("clang -ggdb3 -O0 -std=c11 -Wall -Werror -Wshadow foo.c -lcs50 -lm -o foo\\nfoo.c:1:1: error: ...")
+      ('clang', 'make')
+      >>> route("/usr/bin/cp: overwrite ‘foo.c’?")
+      ('cp',)
+      >>> route("hello, world") is None
+      True
+    """
+    end = output.find("\n")
+    matches = _ROUTER.match(output if end < 0 else output[:end])
+    if matches:
+        return _ROUTES[matches.lastgroup]
+
+
+def _blocks(lines):
+    """
+    Yields (start, end) for each block of lines, wherein each block begins with a diagnostic (or the chain of
+    inclusion that precedes it) and ends before the next. A compiler's command line begins a block too, but one
+    that includes the diagnostic after it, lest the command be diagnosed apart from its errors (e.g., as having
+    compiled successfully). Any other lines before the first diagnostic begin the first block.
+
+      >>> list(_blocks(["clang foo.c", "In file included from foo.c:1:", "bar.h:1:1: error: unknown type name 'x'",
+      ...               "foo.c:2:1: warning: unused variable 'y'", "foo.c:2:1: note: previous declaration is here",
+      ...               "1 error generated."]))
+      [(0, 3), (3, 6)]
+      >>> list(_blocks(["make: Entering directory '/tmp'", "clang foo.c", "foo.c:1:1: error: unknown type name 'x'",
+      ...               "1 error generated.", "make: *** [<builtin>: foo] Error 1"]))
+      [(0, 1), (1, 4), (4, 5)]
+    """
+    start = 0
+    begun = False
+
+    # whether the last line to begin (or continue) a block was a command or chain of inclusion, whose diagnostic
+    # is yet to come
+    leading = False
+    for i, line in enumerate(lines):
+        lead = bool(_COMMAND.match(line)) or line.startswith(_INCLUDED)
+        diagnostic = not lead and _BLOCK.match(line)
+        if (lead or diagnostic) and not leading:
+            if begun:
+                yield start, i
+                start = i
+            begun = True
+        if lead or diagnostic:
+            leading = lead
+    if start < len(lines):
+        yield start, len(lines)
+
+
+def _candidates(domain, lines):
+    """
+    Returns those of domain's helpers that might match lines, in order, per the _candidates function of domain's
+    module, if it has one (as clang's does), else all of them.
+    """
+    try:
+        candidates = _CANDIDATES[domain]
+    except KeyError:
+        candidates = _CANDIDATES[domain] = getattr(load(domain), "_candidates", None)
+    if candidates:
+        return candidates(lines[0])
+    return HELPERS.get(domain, [])
+
+
+def _diagnose_block(block, domains, cache):
+    """Returns (before, after) for the first helper to recognize block, as diagnose would, else None."""
+    for domain in domains:
+        for i in range(len(block)):
+            help = cache.help(domain, block[i:]) if cache is not None else _help(domain, block[i:])
+            if help:
+                return help
+
+
+def _domains():
+    """Returns every domain, in help50's order, loading them all."""
+    load_all()
+    return list(DOMAINS) + [domain for domain in HELPERS.keys() if domain not in DOMAINS]
+
+
+def _help(domain, lines):
+    """Returns the response of the first of domain's helpers to match lines, if any."""
+    return _select(domain, lines)[1]
+
+
+def _routed(output, everywhere=None):
+    """
+    Yields the domains to which output's first line is routed, then every other domain (of everywhere, by
+    default every domain), loading the latter only once those routed to have been tried.
+    """
+    routed = route(output) or ()
+    yield from routed
+    for domain in everywhere or _domains():
+        if domain not in routed:
+            yield domain
+
+
+def _select(domain, lines):
+    """Returns (helper, help) for the first of domain's helpers to match lines, else (None, None)."""
+    for helper in _candidates(domain, lines):
+        help = helper(lines)
+        if help:
+            return helper, help
+    return None, None
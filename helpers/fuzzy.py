@@ -0,0 +1,129 @@
+"""
+Finds, among many words (e.g., commands or filenames), those nearest some misspelling thereof.
+"""
+
+
+def distance(a, b, limit=None):
+    """
+    Returns the edit distance between a and b, counting insertions, deletions, substitutions, and transpositions
+    of adjacent characters (the commonest of typos) as one edit each. If limit is given, returns limit + 1, without
+    measuring further, as soon as the distance is sure to exceed limit.
+
+      >>> distance("make", "mkae"), distance("clang", "clagn"), distance("ls", "sl"), distance("", "cd")
+      (1, 1, 1, 2)
+      >>> distance("readability", "substitution", 2)
+      3
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+
+        # every edit hence costs at least as much as the cheapest of the last two rows, transpositions included
+        if limit is not None and min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def deletions(word, n):
+    """
+    Returns the strings formed by deleting as many as n characters from word, word among them.
+
+      >>> sorted(deletions("cd", 1)), len(deletions("clang", 2))
+      (['c', 'cd', 'd'], 16)
+    """
+    strings = {word}
+    fringe = {word}
+    for _ in range(n):
+        fringe = {string[:i] + string[i + 1:] for string in fringe for i in range(len(string))} - strings
+        strings |= fringe
+    return strings
+
+
+def tolerance(word):
+    """
+    Returns how many edits a misspelling of word's length might plausibly have: 1, or 2 for longer words.
+
+      >>> tolerance("ls"), tolerance("clang"), tolerance("check50")
+      (1, 1, 2)
+    """
+    return 1 if len(word) < 6 else 2
+
+
+class Index:
+    """
+    An index of words, keyed on their deletion neighbourhoods (i.e., the strings formed by deleting as many as
+    radius characters from each), whereby those within radius edits of some word are among those with which it
+    shares a key, without measuring its distance to every word.
+
+      >>> index = Index(["make", "clang", "python3", "check50", "style50", "submit50", "ls"])
+      >>> index.search("clagn"), index.search("chek50"), index.search("foo")
+      ([(1, 'clang')], [(1, 'check50')], [])
+    """
+
+    def __init__(self, words=(), radius=2):
+        self.radius = radius
+        self._keys = {}
+        self._words = set()
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, word):
+        """Adds word to the index."""
+        if word not in self._words:
+            self._words.add(word)
+            for key in deletions(word, self.radius):
+                self._keys.setdefault(key, []).append(word)
+
+    def search(self, word, radius=None):
+        """
+        Returns [(distance, word)] for each word within radius (by default, per the word's length, but no more
+        than the index's own) of word, nearest (then alphabetically) first.
+        """
+        radius = min(tolerance(word) if radius is None else radius, self.radius)
+        candidates = set()
+        for key in deletions(word, radius):
+            candidates.update(self._keys.get(key, ()))
+        return sorted((d, candidate) for d, candidate in ((distance(word, candidate), candidate)
+                                                          for candidate in candidates) if d <= radius)
+
+
+def scan(word, words, radius=None):
+    """
+    Returns [(distance, word)] for each of words within radius (by default, per word's length) of word, nearest
+    (then alphabetically) first, as Index.search does, but by measuring word's distance to each of words (as near
+    in length as could be near at all), which costs less than building an Index if searching but once.
+
+      >>> scan("clagn", ["make", "clang", "cc"]), scan("chek50", ["check50", "style50"]), scan("foo", ["make"])
+      ([(1, 'clang')], [(1, 'check50')], [])
+    """
+    radius = tolerance(word) if radius is None else radius
+    return sorted((d, candidate) for d, candidate in ((distance(word, candidate, radius), candidate)
+                                                      for candidate in words
+                                                      if abs(len(candidate) - len(word)) <= radius) if d <= radius)
+
+
+def alternatives(words):
+    """
+    Returns words, quoted as code and joined with commas and "or".
+
+      >>> alternatives(["make"]), alternatives(["make", "cmake"]), alternatives(["ls", "nl", "sl"])
+      ('`make`', '`make` or `cmake`', '`ls`, `nl`, or `sl`')
+    """
+    words = ["`{}`".format(word) for word in words]
+    if len(words) < 3:
+        return " or ".join(words)
+    return "{}, or {}".format(", ".join(words[:-1]), words[-1])
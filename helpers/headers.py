@@ -0,0 +1,244 @@
+"""
+Maps each function, type, variable, and macro declared in the system's headers (and CS50's) to the header that
+declares it, per an index built offline (e.g., when an image is built) with `python3 -m helpers.headers`, so that
+helpers can name the header a student forgot to #include without scanning any headers themselves.
+"""
+import os
+import re
+import tempfile
+
+from . import _index
+
+# where the index is stored
+INDEX = os.environ.get("HELP50_HEADERS") or os.path.join(_index.DIRECTORY, "headers.idx")
+
+# where to look for headers, if the compiler can't say
+ROOTS = ["/usr/local/include", "/usr/include"]
+
+# the headers to suggest first, in order, when more than one declares a symbol: CS50's, then C's own
+STANDARD = ["cs50.h", "stdio.h", "stdlib.h", "string.h", "ctype.h", "math.h", "stdbool.h", "stdint.h", "stddef.h",
+            "time.h", "limits.h", "float.h", "errno.h", "assert.h", "signal.h", "setjmp.h", "stdarg.h", "locale.h",
+            "inttypes.h", "wchar.h", "wctype.h", "complex.h", "fenv.h", "iso646.h", "stdalign.h", "stdatomic.h",
+            "stdnoreturn.h", "tgmath.h", "threads.h", "uchar.h"]
+
+# the subdirectories of headers to suggest, after those atop a root
+SUBDIRECTORIES = ("arpa", "net", "netinet", "sys")
+
+# the subdirectories of headers never to suggest, whose declarations are ascribed to the headers that include them
+INTERNAL = frozenset(["asm", "asm-generic", "bits", "gnu"])
+
+# C's comments; preprocessor directives, with their continuations; and the like
+_COMMENT = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+_CONTINUATION = re.compile(r"\\\n")
+_DIRECTIVE = re.compile(r"^[ \t]*#[^\n]*", re.MULTILINE)
+_DEFINE = re.compile(r"^[ \t]*#[ \t]*define[ \t]+([A-Za-z]\w*)", re.MULTILINE)
+_INCLUDE = re.compile(r"^[ \t]*#[ \t]*include[ \t]*[<\"]([^>\"]+)[>\"]", re.MULTILINE)
+_LINKAGE = re.compile(r"\bextern\s*\"C(?:\+\+)?\"\s*\{?")
+
+# declarations, sans bodies
+_FUNCTION = re.compile(r"^\s*(?:[A-Za-z_]\w*[\s*]+)+?([A-Za-z]\w*)\s*\(")
+_POINTER = re.compile(r"\(\s*\*\s*([A-Za-z]\w*)\s*\)")
+_TYPEDEF = re.compile(r"^\s*(?:__extension__\s+)?typedef\b")
+_VARIABLE = re.compile(r"^\s*extern\b[^(]*?\b([A-Za-z]\w*)\s*(?:\[[^\]]*\]\s*)*$")
+_NAME = re.compile(r"\b([A-Za-z]\w*)\s*(?:\[[^\]]*\]\s*)*$")
+_MATHCALL = re.compile(r"^\s*__MATH(?:CALL\w*\s*\(|DECL\w*\s*\([^,]*,)\s*([A-Za-z]\w*)\s*,")
+_KEYWORDS = frozenset(["break", "case", "do", "else", "for", "goto", "if", "return", "sizeof", "switch", "while"])
+
+
+def header(symbol, path=None):
+    """Returns the header that declares symbol, per the index at path (by default, INDEX), else None."""
+    return _index.lookup(path or INDEX, symbol)
+
+
+def build(path=None, roots=None):
+    """
+    Indexes every header in roots (by default, wherever the compiler looks) at path (by default, INDEX),
+    returning how many symbols were indexed.
+
+      >>> root = tempfile.mkdtemp()
+      >>> with open(os.path.join(root, "stdio.h"), "w") as f:
+      ...     _ = f.write("extern int printf (const char *__restrict __format, ...);")
+      >>> build(os.path.join(root, "headers.idx"), [root]), header("printf", os.path.join(root, "headers.idx"))
+      (1, 'stdio.h')
+    """
+    path = path or INDEX
+    symbols = scan(roots or _roots())
+    _index.write(path, symbols)
+    return len(symbols)
+
+
+def scan(roots):
+    """
+    Returns {symbol: header} for every symbol declared in the headers in roots (searched in order, as by a
+    compiler), ascribing each to the header likeliest to be the one to #include, per _rank.
+    """
+    # each header's paths, in order of roots, since a header may #include_next its namesake in a later root
+    headers = {}
+    for root in roots:
+        for directory in ("",) + SUBDIRECTORIES:
+            try:
+                names = sorted(os.listdir(os.path.join(root, directory)))
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(".h"):
+                    headers.setdefault(os.path.join(directory, name), []).append(os.path.join(root, directory, name))
+
+    symbols = {}
+    parsed = {}
+    for name, paths in sorted(headers.items(), key=lambda header: _rank(header[0])):
+        seen = set()
+        for path in paths:
+            for symbol in _declared(path, roots, parsed, seen):
+                symbols.setdefault(symbol, name)
+    return symbols
+
+
+def declarations(text):
+    """
+    Returns the names of the functions, types, variables, and macros declared in text, a header, other than
+    those reserved for the implementation (i.e., that begin with an underscore).
+
+      >>> sorted(declarations('''
+      ... /* Print formatted output to stdout. */
+      ... extern int printf (const char *__restrict __format, ...) __attribute__ ((__format__ (__printf__, 1, 2)));
+      ... typedef struct _IO_FILE FILE;
+      ... typedef struct { int quot; int rem; } div_t;
+      ... typedef int (*__compar_fn_t) (const void *, const void *);
+      ... typedef int (*comparison_fn_t) (const void *, const void *);
+      ... #define EOF (-1)
+      ... #define __GLIBC__ 2
+      ... extern char **environ;
+      ... extern __inline int toupper (int __c) { return __c >= 'a' ? __toupper (__c) : __c; }
+      ... extern int __uflow (FILE *);
+      ... __MATHCALL_VEC (pow,, (_Mdouble_ __x, _Mdouble_ __y));
+      ... __MATHDECL_1 (int, __fpclassify,, (_Mdouble_ __value));
+      ... '''))
+      ['EOF', 'FILE', 'comparison_fn_t', 'div_t', 'environ', 'pow', 'printf', 'toupper']
+    """
+    text = _CONTINUATION.sub("", _COMMENT.sub(" ", text))
+    names = set(_DEFINE.findall(text))
+    text = _LINKAGE.sub(" ", _DIRECTIVE.sub("", text))
+
+    # each top-level statement, with any braces' contents elided
+    depth = 0
+    statement = ""
+    for token in re.split(r"([;{}])", text):
+        if token == "{":
+            if depth == 0:
+                statement += "{"
+            depth += 1
+        elif token == "}":
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                statement += "}"
+
+                # a function's definition ends with its body
+                if not _TYPEDEF.match(statement) and _FUNCTION.match(statement):
+                    names.update(_statement(statement))
+                    statement = ""
+        elif token == ";":
+            if depth == 0:
+                names.update(_statement(statement))
+                statement = ""
+        elif depth == 0:
+            statement += token
+    return names
+
+
+def includes(text):
+    """
+    Returns the headers #include'd by text.
+
+      >>> includes('#include <bits/types/FILE.h>\\n#  include "cs50.h"')
+      ['bits/types/FILE.h', 'cs50.h']
+    """
+    return _INCLUDE.findall(_COMMENT.sub(" ", text))
+
+
+def _declared(path, roots, parsed, seen):
+    """
+    Yields the symbols declared in the header at path or in any internal headers it includes (and they include),
+    per roots, memoizing each header's declarations and includes in parsed.
+    """
+    if path in seen:
+        return
+    seen.add(path)
+
+    if path not in parsed:
+        try:
+            with open(path, errors="replace") as f:
+                text = f.read()
+        except OSError:
+            text = ""
+        parsed[path] = (declarations(text), [name for name in includes(text) if name.split("/")[0] in INTERNAL])
+
+    symbols, internals = parsed[path]
+    yield from symbols
+    for name in internals:
+        for root in roots:
+            if os.path.isfile(os.path.join(root, name)):
+                yield from _declared(os.path.join(root, name), roots, parsed, seen)
+                break
+
+
+def _rank(name):
+    """
+    Ranks a header by how likely it is to be the one to #include: CS50's and C's own first (in order of
+    STANDARD), then any others atop a root, then those in SUBDIRECTORIES, each alphabetically.
+
+      >>> sorted(["sys/stat.h", "unistd.h", "stdlib.h", "cs50.h", "stdio.h"], key=_rank)
+      ['cs50.h', 'stdio.h', 'stdlib.h', 'unistd.h', 'sys/stat.h']
+    """
+    if name in STANDARD:
+        return (0, STANDARD.index(name), name)
+    return (1 if "/" not in name else 2, 0, name)
+
+
+def _roots(cc="cc"):
+    """Returns the directories in which cc searches for headers, in order, else ROOTS."""
+    import subprocess
+
+    try:
+        result = subprocess.run([cc, "-xc", "-E", "-v", os.devnull], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+    except OSError:
+        return ROOTS
+
+    lines = result.stderr.splitlines()
+    try:
+        start = lines.index("#include <...> search starts here:") + 1
+        end = lines.index("End of search list.", start)
+    except ValueError:
+        return ROOTS
+    return [line.strip() for line in lines[start:end] if not line.strip().endswith("(framework directory)")]
+
+
+def _statement(statement):
+    """Returns the name declared by a top-level statement, if any, in a list."""
+    if _MATHCALL.match(statement):
+        return [_MATHCALL.match(statement).group(1)]
+    if _TYPEDEF.match(statement):
+        matches = _POINTER.search(statement) or _NAME.search(statement)
+    else:
+        matches = _FUNCTION.match(statement) or _VARIABLE.match(statement)
+        if matches and statement.split(None, 1)[0] in _KEYWORDS:
+            return []
+    return [matches.group(1)] if matches and matches.group(1) not in _KEYWORDS else []
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Indexes the symbols declared in the system's headers.")
+    parser.add_argument("-o", "--output", default=INDEX, help="where to write the index")
+    parser.add_argument("--cc", default=os.environ.get("CC", "cc"), help="the compiler whose headers to index")
+    parser.add_argument("roots", nargs="*", help="directories to search for headers (by default, the compiler's)")
+    args = parser.parse_args()
+
+    count = build(args.output, args.roots or _roots(args.cc))
+    print("Indexed {} symbols in {}".format(count, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Maps each function and variable defined by the libraries in the linker's search path to the library (e.g., m,
+for -lm) that defines it, per an index built offline with `python3 -m helpers.libraries`, so that helpers can
+name the library against which a student forgot to link.
+
+Libraries' symbol tables are read from their ELF (or ar archives') own tables, sans external tools. Each file's
+symbols are remembered in a manifest alongside the index, keyed on its path, size, and mtime, so that rebuilding
+the index only reads those libraries that have changed since.
+"""
+import json
+import os
+import re
+import tempfile
+
+from . import _index
+
+# where the index and its manifest are stored
+INDEX = os.environ.get("HELP50_LIBRARIES") or os.path.join(_index.DIRECTORY, "libraries.idx")
+
+# where to look for libraries, if the compiler can't say
+DIRECTORIES = ["/usr/local/lib", "/lib", "/usr/lib"]
+
+# the libraries to suggest first, in order, when more than one (not linked anyway) defines a symbol
+PREFERRED = ["cs50", "m", "crypt", "pthread", "dl", "rt"]
+
+# the libraries against which every program is linked anyway
+IMPLICIT = frozenset(["c", "gcc", "gcc_s"])
+
+# a linker script's inputs, e.g., GROUP ( /lib/x86_64-linux-gnu/libm.so.6 AS_NEEDED ( ... ) )
+_SCRIPT = re.compile(r"\b(?:GROUP|INPUT)\s*\(([^)]*(?:\([^)]*\)[^)]*)*)\)")
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+# ELF's headers, per class (32- or 64-bit), sans e_ident
+_ELF = {1: "HHIIIIIHHHHHH", 2: "HHIQQQIHHHHHH"}
+_SECTION = {1: "IIIIIIIIII", 2: "IIQQQQIIQQ"}
+_SYMBOL = {1: "IIIBBH", 2: "IBBHQQ"}
+_SHT_SYMTAB, _SHT_DYNSYM = 2, 11
+_STB = frozenset([1, 2, 10])   # GLOBAL, WEAK, GNU_UNIQUE
+_STT = frozenset([1, 2, 10])   # OBJECT, FUNC, GNU_IFUNC
+
+
+def library(symbol, path=None):
+    """Returns the library (e.g., m) that defines symbol, per the index at path (by default, INDEX), else None."""
+    return _index.lookup(path or INDEX, symbol)
+
+
+def build(path=None, directories=None):
+    """
+    Indexes every library in directories (by default, wherever the linker looks) at path (by default, INDEX),
+    reading only those libraries not already in the index's manifest as is. Returns (libraries indexed, files
+    read, symbols indexed).
+    """
+    path = path or INDEX
+    manifest = path + ".json"
+    try:
+        with open(manifest) as f:
+            files = json.load(f)
+    except (OSError, ValueError):
+        files = {}
+
+    read = 0
+    current = {}
+    names = libraries(directories or _directories())
+    symbols = {}
+    for name in sorted(names, key=_rank):
+        for file in _inputs(names[name]):
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+            entry = files.get(file)
+            if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "symbols": sorted(_symbols(file))}
+                read += 1
+            current[file] = entry
+            for symbol in entry["symbols"]:
+                symbols.setdefault(symbol, name)
+
+    _index.write(path, symbols)
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path) or ".", delete=False) as f:
+        json.dump(current, f)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, manifest)
+    return len(names), read, len(symbols)
+
+
+def libraries(directories):
+    """
+    Returns {name: path} for each library (e.g., {"m": "/usr/lib/libm.so"}) in directories, as the linker
+    would find it for -lname: in the first directory with lib<name>.so or, failing that, lib<name>.a.
+    """
+    found = {}
+    for directory in directories:
+        try:
+            files = os.listdir(directory)
+        except OSError:
+            continue
+        names = {}
+        for file in files:
+            for suffix in (".so", ".a"):
+                if file.startswith("lib") and file.endswith(suffix):
+                    names.setdefault(file[len("lib"):-len(suffix)], []).append(suffix)
+        for name, suffixes in names.items():
+            if name not in found:
+                found[name] = os.path.join(directory, "lib" + name + (".so" if ".so" in suffixes else ".a"))
+    return found
+
+
+def script(text):
+    """
+    Returns the files named by a linker script's GROUP and INPUT commands.
+
+      >>> script('''/* GNU ld script */
+      ... OUTPUT_FORMAT(elf64-x86-64)
+      ... GROUP ( /lib/libc.so.6 /usr/lib/libc_nonshared.a  AS_NEEDED ( /lib64/ld-linux-x86-64.so.2 ) )''')
+      ['/lib/libc.so.6', '/usr/lib/libc_nonshared.a', '/lib64/ld-linux-x86-64.so.2']
+    """
+    return [file for inputs in _SCRIPT.findall(_COMMENT.sub(" ", text))
+            for file in re.findall(r"[^\s()]+", inputs) if file != "AS_NEEDED" and not file.startswith("-l")]
+
+
+def archive(data):
+    """
+    Returns the symbols listed in an ar archive's symbol table (as written by GNU ar), which are those defined
+    by its members.
+
+      >>> import struct
+      >>> names = b"get_int\\0get_string\\0"
+      >>> table = struct.pack(">II", 2, 0) + struct.pack(">I", 0) + names
+      >>> sorted(archive(b"!<arch>\\n" + b"/".ljust(48) + str(len(table)).encode().ljust(10) + b"`\\n" + table))
+      ['get_int', 'get_string']
+    """
+    if data[:8] != b"!<arch>\n":
+        return set()
+
+    name, size = data[8:24].strip(), int(data[56:66])
+    table = data[68:68 + size]
+    if name == b"/":
+        width = 4
+    elif name == b"/SYM64/":
+        width = 8
+    else:
+        return set()
+    count = int.from_bytes(table[:width], "big")
+    strings = table[width * (count + 1):]
+    return {symbol.decode("utf-8", "replace") for symbol in strings.split(b"\0")[:count] if symbol}
+
+
+def elf(data):
+    """
+    Returns the global functions and variables defined by an ELF object's dynamic symbol table (or, if none, its
+    symbol table).
+
+      >>> import struct
+      >>> strings = b"\\0printf\\0"
+      >>> symbols = struct.pack("<IBBHQQ", 0, 0, 0, 0, 0, 0) + struct.pack("<IBBHQQ", 1, 0x12, 0, 1, 0, 0)
+      >>> sections = b"".join(struct.pack("<IIQQQQIIQQ", *section) for section in [
+      ...     (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+      ...     (0, 3, 0, 0, 64, len(strings), 0, 0, 1, 0),
+      ...     (0, 11, 0, 0, 64 + len(strings), len(symbols), 1, 0, 8, 24)])
+      >>> header = b"\\x7fELF\\x02\\x01\\x01".ljust(16, b"\\0") + struct.pack(
+      ...     "<HHIQQQIHHHHHH", 3, 62, 1, 0, 0, 64 + len(strings) + len(symbols), 0, 64, 0, 0, 64, 3, 0)
+      >>> elf(header + strings + symbols + sections)
+      {'printf'}
+    """
+    import struct
+
+    if data[:4] != b"\x7fELF" or data[4] not in _ELF or data[5] not in (1, 2):
+        return set()
+    width, order = data[4], "<" if data[5] == 1 else ">"
+
+    header = struct.unpack_from(order + _ELF[width], data, 16)
+    shoff, shentsize, shnum = header[5], header[10], header[11]
+    sections = [struct.unpack_from(order + _SECTION[width], data, shoff + i * shentsize) for i in range(shnum)]
+    tables = [section for section in sections if section[1] == _SHT_DYNSYM] or \
+        [section for section in sections if section[1] == _SHT_SYMTAB]
+
+    symbols = set()
+    layout = struct.Struct(order + _SYMBOL[width])
+    for table in tables:
+        strings = sections[table[6]]
+        start, end = strings[4], strings[4] + strings[5]
+        for symbol in layout.iter_unpack(data[table[4]:table[4] + table[5] - table[5] % layout.size]):
+            if width == 2:
+                name, info, _, shndx = symbol[:4]
+            else:
+                name, info, shndx = symbol[0], symbol[3], symbol[5]
+            if shndx and info >> 4 in _STB and info & 0xf in _STT and name:
+                symbols.add(data[start + name:data.find(b"\0", start + name, end)].decode("utf-8", "replace"))
+    return symbols
+
+
+def _directories(cc="cc"):
+    """Returns the directories in which cc's linker searches for libraries, in order, else DIRECTORIES."""
+    import subprocess
+
+    try:
+        result = subprocess.run([cc, "-print-search-dirs"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True)
+    except OSError:
+        return DIRECTORIES
+
+    for line in result.stdout.splitlines():
+        if line.startswith("libraries: ="):
+            directories = []
+            for directory in line[len("libraries: ="):].split(":"):
+                directory = os.path.realpath(directory)
+                if directory not in directories:
+                    directories.append(directory)
+            return directories
+    return DIRECTORIES
+
+
+def _inputs(path):
+    """Returns the files that -l would link for a library at path: itself, or those its linker script names."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+            if head.startswith(b"\x7fELF") or head.startswith(b"!<arch>\n"):
+                return [os.path.realpath(path)]
+            text = (head + f.read(1 << 16)).decode("utf-8", "replace")
+    except OSError:
+        return []
+    return [os.path.realpath(file) for file in script(text) if os.path.isabs(file)]
+
+
+def _rank(name):
+    """
+    Ranks a library by how likely it is to be the one that defines a symbol: those IMPLICIT first (lest a
+    symbol that's linked anyway be ascribed to another), then those in PREFERRED (in order), then others,
+    shortest name first.
+
+      >>> sorted(["ssl", "m", "cs50", "z", "c", "mvec"], key=_rank)
+      ['c', 'cs50', 'm', 'z', 'ssl', 'mvec']
+    """
+    if name in IMPLICIT:
+        return (0, 0, name)
+    if name in PREFERRED:
+        return (1, PREFERRED.index(name), name)
+    return (2, len(name), name)
+
+
+def _symbols(path):
+    """Returns the symbols defined by the library at path, an ELF object or ar archive."""
+    import mmap
+    import struct
+
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return archive(data) if data[:8] == b"!<arch>\n" else elf(data)
+    except (OSError, ValueError, struct.error, IndexError):
+        return set()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Indexes the symbols defined by the linker's libraries.")
+    parser.add_argument("-o", "--output", default=INDEX, help="where to write the index")
+    parser.add_argument("--cc", default=os.environ.get("CC", "cc"), help="the compiler whose libraries to index")
+    parser.add_argument("directories", nargs="*", help="directories to search (by default, the linker's)")
+    args = parser.parse_args()
+
+    names, read, symbols = build(args.output, args.directories or _directories(args.cc))
+    print("Indexed {} symbols from {} libraries ({} files read) in {}".format(symbols, names, read, args.output))
+
+
+if __name__ == "__main__":
+    main()
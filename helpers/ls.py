@@ -1,9 +1,12 @@
 import re
 
-from . import _common
+from . import _common, fuzzy, paths
 
 from help50 import helper
 
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("ls: cannot access ",)
+
 
 @helper("ls")
 def cannot_access(lines):
@@ -17,9 +20,11 @@ def cannot_access(lines):
     if not matches:
         return
 
-    response = [
-        "Are you sure `{}` exists?".format(matches.group(1)),
-        "Did you misspell `{}`?".format(matches.group(1))
-    ]
+    response = ["Are you sure `{}` exists?".format(matches.group(1))]
+    suggestions = paths.suggest(matches.group(1).strip("'‘’"))
+    if suggestions:
+        response.append("Did you mean {}?".format(fuzzy.alternatives(suggestions)))
+    else:
+        response.append("Did you misspell `{}`?".format(matches.group(1)))
 
     return lines[0:1], response
@@ -1,7 +1,12 @@
 import re
 
+from . import fuzzy, targets
+
 from help50 import helper
 
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("make: ", "clang")
+
 
 @helper("make")
 def no_rule_to_make(lines):
@@ -10,21 +15,23 @@ def no_rule_to_make(lines):
               "make: *** No rule to make target 'foo'.  Stop." \
           ])[1][0]
       True
+      >>> "`make caesar`" in no_rule_to_make([                    \
+              "make: *** No rule to make target 'ceaser'.  Stop." \
+          ])[1][0]
+      True
+      >>> "correctly spelled" in no_rule_to_make([                \
+              "make: *** No rule to make target 'caesar'.  Stop." \
+          ])[1][-1]
+      True
     """
     matches = re.search(r"^make: \*\*\* No rule to make target '(.+)'.  Stop.", lines[0])
     if not matches:
         return
 
-    if matches.group(1) in ["ceasar", "ceaser", "cesar", "caesaer"]:
+    suggestions = targets.resolve(matches.group(1))
+    if suggestions:
         response = [
-            "Did you mean to type `make caesar`?"
-        ]
-
-        return lines[0:1], response
-
-    elif matches.group(1) in ["caesar"]:
-        response = [
-            "Is your C file correctly spelled as `caesar.c`?"
+            "Did you mean to type {}?".format(fuzzy.alternatives("make " + suggestion for suggestion in suggestions))
         ]
 
         return lines[0:1], response
@@ -34,6 +41,10 @@ def no_rule_to_make(lines):
         "If using a Makefile, are you sure you have a target called `{}`?".format(matches.group(1))
     ]
 
+    # one of the course's problems, whose source is likelier misspelled than missing
+    if matches.group(1) in targets.problems():
+        response.append("Is your C file correctly spelled as `{}.c`?".format(matches.group(1)))
+
     return lines[0:1], response
 
 
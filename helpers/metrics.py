@@ -0,0 +1,160 @@
+"""
+Opt-in instrumentation of helpers: how often each is invoked, how often it matches, and how long it takes.
+
+While disabled (the default), helpers are left untouched and so cost nothing extra. Once enabled, every helper
+registered with help50 is replaced (in help50's HELPERS) with a wrapper that records its metrics.
+"""
+import bisect
+import functools
+import json
+import time
+
+from help50 import HELPERS
+
+from . import load_all
+
+# upper bounds, in seconds, of the latency histogram's buckets (beyond which is +Inf)
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+# the unwrapped helpers, keyed on their wrappers, while enabled
+_originals = {}
+
+# metrics, keyed on (domain, helper's name)
+_metrics = {}
+
+
+class _Metrics:
+    """One helper's invocations, matches, and latency histogram."""
+
+    __slots__ = ("invocations", "matches", "seconds", "buckets")
+
+    def __init__(self):
+        self.invocations = 0
+        self.matches = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def record(self, seconds, matched):
+        self.invocations += 1
+        self.matches += bool(matched)
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+def enable():
+    """
+    Wraps every helper so as to record its metrics, loading every domain first.
+
+      >>> from . import runtime
+      >>> enable()
+      >>> help = HELPERS["runtime"][0](["Segmentation fault (core dumped)"])
+      >>> help = HELPERS["runtime"][1](["Segmentation fault (core dumped)"])
+      >>> snapshot()["runtime"]["segmentation_fault"]["matches"]
+      1
+      >>> disable()
+      >>> HELPERS["runtime"][1] is runtime.segmentation_fault
+      True
+    """
+    load_all()
+    for domain, helpers in HELPERS.items():
+        for i, helper in enumerate(helpers):
+            if helper not in _originals:
+                wrapper = _wrap(domain, helper)
+                _originals[wrapper] = helper
+                helpers[i] = wrapper
+
+
+def disable():
+    """Restores every registered helper to its unwrapped self, keeping the metrics recorded thus far."""
+    for helpers in HELPERS.values():
+        for i, helper in enumerate(helpers):
+            helpers[i] = _originals.get(helper, helper)
+    _originals.clear()
+
+
+def enabled():
+    """Returns whether helpers are being instrumented."""
+    return bool(_originals)
+
+
+def reset():
+    """Discards all metrics recorded thus far."""
+    for metrics in _metrics.values():
+        metrics.__init__()
+
+
+def snapshot():
+    """Returns all metrics, as {domain: {helper: {...}}}, with the histogram's buckets cumulative."""
+    snapshot = {}
+    for (domain, name), metrics in sorted(_metrics.items()):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(BUCKETS + (float("inf"),), metrics.buckets):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+
+        snapshot.setdefault(domain, {})[name] = {
+            "invocations": metrics.invocations,
+            "matches": metrics.matches,
+            "seconds": metrics.seconds,
+            "buckets": buckets
+        }
+    return snapshot
+
+
+def to_json():
+    """Returns all metrics as JSON."""
+    return json.dumps(snapshot(), indent=4, sort_keys=True)
+
+
+def to_prometheus():
+    """
+    Returns all metrics in Prometheus's text format.
+
+      >>> reset()
+      >>> print(to_prometheus().splitlines()[0])
+      # HELP help50_helper_invocations_total Times a helper was invoked.
+    """
+    lines = []
+
+    def family(name, kind, description, samples):
+        lines.append("# HELP {} {}".format(name, description))
+        lines.append("# TYPE {} {}".format(name, kind))
+        for suffix, labels, value in samples:
+            lines.append("{}{}{{{}}} {}".format(name, suffix, ",".join('{}="{}"'.format(*label) for label in labels),
+                                                value))
+
+    metrics = [(domain, name, helper) for domain, helpers in snapshot().items() for name, helper in helpers.items()]
+    family("help50_helper_invocations_total", "counter", "Times a helper was invoked.",
+           [("", [("domain", domain), ("helper", name)], helper["invocations"]) for domain, name, helper in metrics])
+    family("help50_helper_matches_total", "counter", "Times a helper recognized its input.",
+           [("", [("domain", domain), ("helper", name)], helper["matches"]) for domain, name, helper in metrics])
+    family("help50_helper_latency_seconds", "histogram", "How long a helper took.",
+           [sample for domain, name, helper in metrics for sample in
+               [("_bucket", [("domain", domain), ("helper", name), ("le", bound)], count)
+                   for bound, count in helper["buckets"].items()] +
+               [("_sum", [("domain", domain), ("helper", name)], repr(helper["seconds"])),
+                ("_count", [("domain", domain), ("helper", name)], helper["invocations"])]])
+    return "\n".join(lines) + "\n"
+
+
+def dump(path, format="prometheus"):
+    """Writes all metrics to path in the given format, "prometheus" or "json"."""
+    text = to_json() if format == "json" else to_prometheus()
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _wrap(domain, helper):
+    """Returns a wrapper for helper that records its metrics."""
+    metrics = _metrics.setdefault((domain, helper.__name__), _Metrics())
+    clock = time.perf_counter
+
+    @functools.wraps(helper)
+    def wrapper(lines):
+        start = clock()
+        help = helper(lines)
+        metrics.record(clock() - start, help)
+        return help
+
+    return wrapper
@@ -0,0 +1,124 @@
+"""
+Suggests, for a path that doesn't exist, the existing paths nearest it, matching it component by component
+against each directory's entries, per a listing of each directory that's read the first time it's needed and
+read anew only once the directory has changed (as evidenced by its mtime). A long-lived process (e.g.,
+helpers.server) can instead warm indexes of those listings, each built the first time it's needed, whereby
+matching costs less than measuring a component's distance to every entry, though building costs more, which is
+why a process that suggests but once (e.g., help50's own) doesn't.
+"""
+import os
+
+from . import fuzzy
+
+# how many paths to suggest, at most
+LIMIT = 3
+
+# how many directories' indexes to keep, at most
+CAPACITY = 256
+
+# how many entries a directory can have before only its entries' single-character typos are matched, lest its
+# index grow quadratically with their names' lengths
+LARGE = 10000
+
+# each directory's mtime, entries, those entries that are directories, and index of its entries (if built), keyed
+# on its path, least recently used first
+_listings = {}
+
+# whether to search indexes of listings, per warm, rather than measure distances to each entry
+_indexing = False
+
+
+def suggest(path, directory=False, limit=LIMIT):
+    """
+    Returns the existing paths nearest path (only directories, if directory), as many as limit, among those
+    equally near, if path doesn't itself exist. Each of path's components is matched against the entries of the
+    directory (or directories) matched by those before it, the nearest few of which are matched in turn.
+
+      >>> import tempfile
+      >>> root = tempfile.mkdtemp()
+      >>> for name in ("pset1/mario", "pset1/cash", "pset2/caesar"):
+      ...     os.makedirs(os.path.join(root, name))
+      >>> open(os.path.join(root, "pset1", "mario", "mario.c"), "w").close()
+      >>> suggest(os.path.join(root, "pste1/mairo/mario.c")) == [os.path.join(root, "pset1/mario/mario.c")]
+      True
+      >>> [os.path.relpath(path, root) for path in suggest(os.path.join(root, "pset3"), directory=True)]
+      ['pset1', 'pset2']
+      >>> suggest(os.path.join(root, "pset1/mario/mario.c")), suggest(os.path.join(root, "pset1/hello"))
+      ([], [])
+    """
+    # only the last component of a path needn't be a directory
+    components = [component for component in path.split("/") if component]
+    directory = directory or path.endswith("/")
+
+    beam = [(0, "/" if path.startswith("/") else "")]
+    for i, component in enumerate(components):
+        directories = directory or i < len(components) - 1
+        candidates = []
+        for d, prefix in beam:
+            if component in (os.curdir, os.pardir):
+                candidates.append((d, os.path.join(prefix, component)))
+                continue
+            listing = _listing(prefix or os.curdir)
+            if listing is None:
+                continue
+            names, subdirectories, search = listing
+            if component in (subdirectories if directories else names):
+                matches = [(0, component)]
+            else:
+                matches = [(e, name) for e, name in search(component) if not directories or name in subdirectories]
+            candidates.extend((d + e, os.path.join(prefix, name)) for e, name in matches)
+        beam = sorted(candidates)[:limit]
+
+    if not beam or beam[0][0] == 0:
+        return []
+    return [path for d, path in beam if d == beam[0][0]]
+
+
+def warm():
+    """Searches indexes of directories' listings henceforth, as befits a process that will suggest again and again."""
+    global _indexing
+    _indexing = True
+
+
+# HELPERS FOR THE HELPERS
+
+def _listing(directory):
+    """
+    Returns directory's entries, the set of those that are directories, and a function that returns [(distance,
+    entry)] for the entries near some name (per an index of them, if warmed), read anew if directory has changed
+    since last read, else None if directory can't be listed.
+    """
+    key = os.path.abspath(directory)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        return None
+
+    listing = _listings.pop(key, None)
+    if listing is None or listing[0] != mtime:
+        names, directories = [], set()
+        try:
+            with os.scandir(key) as entries:
+                for entry in entries:
+                    names.append(entry.name)
+                    try:
+                        if entry.is_dir():
+                            directories.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        listing = [mtime, frozenset(names), frozenset(directories), None]
+
+    # remember directory as the most recently used, forgetting the least recently used if need be
+    _listings[key] = listing
+    while len(_listings) > CAPACITY:
+        del _listings[next(iter(_listings))]
+
+    names = listing[1]
+    radius = 2 if len(names) <= LARGE else 1
+    if not _indexing:
+        return names, listing[2], lambda name: fuzzy.scan(name, names, min(fuzzy.tolerance(name), radius))
+    if listing[3] is None:
+        listing[3] = fuzzy.Index(names, radius=radius)
+    return names, listing[2], listing[3].search
@@ -0,0 +1,57 @@
+"""
+Rules out, per output, those domains none of whose helpers can possibly match it, before any of them runs.
+
+Each domain's module declares, as LITERALS, the literals (e.g., "make: ") at least one of which occurs in any
+output that any of its helpers recognizes. If none of a domain's literals occurs anywhere in some output, none of
+the domain's helpers need be offered any of its lines. A domain that declares none is offered every output.
+"""
+import ast
+import doctest
+
+from help50 import HELPERS
+
+from . import DOMAINS, load
+
+
+def admits(domain, output):
+    """
+    Returns whether any of domain's helpers might match any of output's lines, per domain's LITERALS.
+
+      >>> admits("make", "make: *** No rule to make target 'foo'.  Stop.")
+      True
+      >>> admits("make", "bash: foo: command not found")
+      False
+
+    Every helper's own examples (those in its docstring) are admitted by its domain:
+
+      >>> [helper.__name__ for domain, helper, output in _examples() if not admits(domain, output)]
+      []
+      >>> [domain for domain in DOMAINS if not hasattr(load(domain), "LITERALS")]
+      []
+    """
+    literals = getattr(load(domain), "LITERALS", None)
+    if literals is None:
+        return True
+    for literal in literals:
+        if literal in output:
+            return True
+    return False
+
+
+# HELPERS FOR THE HELPERS
+
+def _examples():
+    """
+    Yields (domain, helper, output) for every example in every helper's docstring that expects True, output being
+    the example's strings, one per line.
+    """
+    parser = doctest.DocTestParser()
+    for domain in DOMAINS:
+        load(domain)
+        for helper in HELPERS.get(domain, []):
+            for example in parser.get_examples(helper.__doc__ or ""):
+                if example.want.strip() != "True":
+                    continue
+                strings = [node.value for node in ast.walk(ast.parse(example.source))
+                           if isinstance(node, ast.Constant) and isinstance(node.value, str)]
+                yield domain, helper, "\n".join(strings)
@@ -2,6 +2,9 @@ import re
 
 from help50 import helper
 
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("Floating point exception", "Segmentation fault")
+
 
 @helper("runtime")
 def floating_point_exception(lines):
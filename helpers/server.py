@@ -0,0 +1,264 @@
+"""
+Diagnoses output sent over a Unix domain socket (e.g., by helpers.client), keeping every helper loaded, and its
+regexes compiled and caches warm, across requests, so that each request needn't start Python anew.
+
+Usage: python3 -m helpers.server [--socket PATH] [--workers N] [--queue N]
+
+Each request is a line of JSON, {"output": "...", "domains": [...] or null, "cwd": "...", "PATH": "..."}, to
+which the response is a line of JSON, {"help": [before, after] or null} or {"error": "..."}. Output is diagnosed
+in cwd (an absolute path) and with PATH as $PATH, the client's own, if given, so that the paths and commands
+suggested are the client's, not the server's. A connection may send any number of requests, each answered in
+turn.
+
+Because a server reads files on its clients' behalf, it answers only clients of its own user: its socket is
+accessible only to that user, and (where the kernel says, per SO_PEERCRED) connections from other users'
+processes are refused. Each user runs a server of their own.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import signal
+import socket
+import struct
+
+from . import cache, commands, dispatch, load_all, paths
+from .client import SOCKET, encode
+
+# the longest request, in bytes, beyond which its connection is closed
+LIMIT = 1 << 24
+
+# how long, in seconds, a connection may take to send its next request, beyond which it's closed
+IDLE = 30
+
+# this process's cache of which helper recognizes which message, once warmed
+_cache = None
+
+
+class Server:
+    """
+    Diagnoses requests across a pool of workers processes (by default, one per CPU), with at most queue
+    requests (by default, four per worker) being diagnosed or awaiting a worker at once. Each connection reads
+    one request (of at most LIMIT bytes) at a time, not reading the next until the last has been answered, so
+    until a slot frees up, clients' writes block rather than the server's memory growing, and is closed if it
+    sends no request for IDLE seconds. If workers is 0, requests are diagnosed one at a time in the server's own
+    process.
+
+      >>> import tempfile
+      >>> from . import client
+      >>> async def ask(path, output):
+      ...     async with Server(path, workers=0):
+      ...         return await asyncio.get_running_loop().run_in_executor(None, client.request, output, path)
+      >>> asyncio.run(ask(os.path.join(tempfile.mkdtemp(), "help50.sock"), "bash: foo: command not found"))[1][0]
+      'Are you sure `foo` exists?'
+    """
+
+    def __init__(self, path=SOCKET, workers=None, queue=None):
+        self.path = path
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue = queue or max(self.workers, 1) * 4
+        self._executor = None
+        self._server = None
+        self._slots = None
+
+        # each open connection's writer, keyed on the task handling it
+        self._connections = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Warms the workers, then listens at path, accessible only to this process's user."""
+        _unlink_stale(self.path)
+        self._slots = asyncio.Semaphore(self.queue)
+
+        if self.workers:
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_warm)
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm) for _ in range(self.workers)))
+        else:
+            _warm()
+
+        # lest another user connect before the socket's permissions are restricted
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, self.path, limit=LIMIT)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+
+    async def serve_forever(self):
+        """Serves until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening, closes open connections once answered, shuts down the workers, and removes the socket."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._connections.values():
+            writer.transport.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def _handle(self, reader, writer):
+        """Answers a connection's requests in turn, until it closes."""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            if _peer(writer) not in (None, os.getuid()):
+                writer.write(encode({"error": "permission denied"}))
+                await writer.drain()
+                return
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), IDLE)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:
+                    writer.write(encode({"error": "request exceeds {} bytes".format(LIMIT)}))
+                    break
+                if not line:
+                    break
+                writer.write(encode(await self._respond(line)))
+                await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(self, line):
+        """Returns the response to a request, once a slot (and worker) is free."""
+        try:
+            request = json.loads(line)
+            output, domains = request["output"], request.get("domains")
+            cwd, path = request.get("cwd"), request.get("PATH")
+            if not isinstance(output, str) or not (domains is None or all(isinstance(domain, str)
+                                                                          for domain in domains)):
+                raise TypeError
+            if not (cwd is None or isinstance(cwd, str) and os.path.isabs(cwd)) or \
+                    not (path is None or isinstance(path, str)):
+                raise TypeError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"error": "malformed request"}
+
+        async with self._slots:
+            try:
+                if self._executor:
+                    help = await asyncio.get_running_loop().run_in_executor(self._executor, _diagnose, output,
+                                                                            domains, cwd, path)
+                else:
+                    help = _diagnose(output, domains, cwd, path)
+            except Exception as e:
+                return {"error": "{}: {}".format(type(e).__name__, e)}
+        return {"help": help}
+
+
+async def serve(path=SOCKET, workers=None, queue=None):
+    """Serves at path until interrupted or terminated."""
+    async with Server(path, workers, queue) as server:
+        task = asyncio.current_task()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await server.serve_forever()
+
+
+def _diagnose(output, domains, cwd=None, path=None):
+    """Diagnoses output, as a worker, through this process's cache, in cwd and with path as $PATH, if given."""
+    _warm()
+    with _environment(cwd, path):
+        return dispatch.diagnose(output, domains or None, cache=_cache)
+
+
+@contextlib.contextmanager
+def _environment(cwd, path):
+    """
+    Changes into cwd and sets $PATH to path (either, if None, left as is) for the duration, restoring both after.
+    Raises OSError if cwd can't be changed into. Only safe in a process diagnosing one request at a time.
+
+      >>> import tempfile
+      >>> before, directory = os.getcwd(), os.path.realpath(tempfile.mkdtemp())
+      >>> with _environment(directory, "/nowhere"):
+      ...     os.getcwd() == directory, os.environ["PATH"]
+      (True, '/nowhere')
+      >>> os.getcwd() == before, os.environ.get("PATH") != "/nowhere"
+      (True, True)
+    """
+    cwd_before, path_before = os.getcwd(), os.environ.get("PATH")
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        if path is not None:
+            os.environ["PATH"] = path
+        yield
+    finally:
+        os.chdir(cwd_before)
+        if path_before is None:
+            os.environ.pop("PATH", None)
+        else:
+            os.environ["PATH"] = path_before
+
+
+def _peer(writer):
+    """Returns the uid of the process at the other end of writer's connection, else None if the kernel can't say."""
+    try:
+        credentials = writer.get_extra_info("socket").getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                                  struct.calcsize("3i"))
+    except (AttributeError, OSError):
+        return None
+    pid, uid, gid = struct.unpack("3i", credentials)
+    return uid
+
+
+def _unlink_stale(path):
+    """Removes the socket at path, if any, unless some server is still listening there."""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+        else:
+            raise OSError("already serving at {}".format(path))
+
+
+def _warm():
+    """
+    Loads every domain, indexes the executables on $PATH, and has paths index the directories it lists, the first
+    time this process is asked to.
+    """
+    global _cache
+    if _cache is None:
+        load_all()
+        commands.warm()
+        paths.warm()
+        _cache = cache.Cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnoses output sent over a Unix domain socket.")
+    parser.add_argument("-s", "--socket", default=SOCKET, help="where to listen")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (by default, one per CPU)")
+    parser.add_argument("-q", "--queue", type=int, help="requests in flight at once (by default, 4 per worker)")
+    args = parser.parse_args()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.socket, args.workers, args.queue))
+
+
+if __name__ == "__main__":
+    main()
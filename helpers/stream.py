@@ -0,0 +1,155 @@
+"""
+Diagnoses output as it arrives, one line at a time, keeping only a bounded window of lines in memory.
+
+Usage: some_command 2>&1 | python3 -m helpers.stream
+"""
+import collections
+import re
+import sys
+
+from . import _common, dispatch
+
+# how many lines to buffer before asking helpers about the oldest, enough for clang's caret and note lines
+WINDOW = 8
+
+# likewise for valgrind, whose errors are followed by up to --num-callers (12, by default) stack frames
+VALGRIND_WINDOW = 32
+
+# valgrind's banner, atop its output
+_MEMCHECK = re.compile(_common.MEMCHECK)
+
+# ANSI codes (e.g., colors), which help50 strips too
+_ANSI = re.compile(_common.ANSI)
+
+# how many of valgrind's first lines (through "Command: ...") to keep, since its helpers expect them
+VALGRIND_HEADER = 8
+
+# valgrind's count of an error's repeats, which, being only of those in the window, is counted anew across windows
+_REPEATED = re.compile(r"^And that happened [\d,]+ times!$")
+
+
+def diagnose(lines, window=None):
+    """
+    Yields (before, after) for each diagnosis of lines, an iterable of lines (e.g., a file or pipe), as soon as
+    the lines that follow it have been read. Each of valgrind's errors is diagnosed only once, however many times
+    it recurs, and, once lines run out, how many times each error that recurred did so.
+
+      >>> for before, after in diagnose(iter([                                    \
+              "make: *** No rule to make target 'foo'.  Stop.",                   \
+              "foo.c:1:1: error: unknown type name 'string'",                     \
+              "string s;",                                                        \
+              "^",                                                                \
+              "Segmentation fault (core dumped)"                                  \
+          ])):
+      ...     print(len(before), after[0])
+      1 Do you actually have a file called `foo.c` in the current directory?
+      3 You seem to be using `string` on line 1 of `foo.c` as though it's a type, even though it's not been defined as one.
+      1 Looks like your program is trying to access areas of memory that it isn't supposed to access.
+
+      >>> for before, after in diagnose([                                         \
+              "==4412== Memcheck, a memory error detector",                       \
+              "==4412== Command: ./a.out",                                        \
+              "==4412== Invalid read of size 4",                                  \
+              "==4412==    at 0x40054F: foo (foo.c:7)",                           \
+              "==4412==    by 0x400568: main (foo.c:12)",                         \
+              "==4412== Invalid write of size 4",                                 \
+              "==4412==    at 0x400550: foo (foo.c:8)",                           \
+              "==4412==    by 0x400568: main (foo.c:12)"                          \
+          ]):
+      ...     print(len(before), after[-1])
+      3 Take a closer look at line 7 of `foo.c`.
+      3 Take a closer look at line 8 of `foo.c`.
+
+      >>> error = ["==4412== Invalid read of size 4", "==4412==    at 0x40054F: foo (foo.c:7)"]
+      >>> for before, after in diagnose(["==4412== Memcheck, a memory error detector", "==4412== Command: ./a.out"]
+      ...                               + error * 5, window=4):
+      ...     print(len(before), after[-1])
+      2 Take a closer look at line 7 of `foo.c`.
+      2 And that happened 5 times!
+    """
+    lines = (_clean(line) for line in lines)
+
+    # keep valgrind's header, if any, since its helpers only recognize output that begins with it
+    header = []
+    buffer = collections.deque()
+    for line in lines:
+        if header or _MEMCHECK.search(line):
+            header.append(line)
+            if " Command: " in line or len(header) == VALGRIND_HEADER:
+                break
+        else:
+            buffer.append(line)
+            break
+
+    if window is None:
+        window = VALGRIND_WINDOW if header else WINDOW
+
+    # how many times each of valgrind's errors, per the lines it explains, has occurred thus far
+    counts = collections.Counter() if header else None
+
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= window:
+            yield from _advance(header, buffer, counts)
+
+    while buffer:
+        yield from _advance(header, buffer, counts)
+
+    for before, count in (counts or {}).items():
+        if count > 1:
+            yield list(before), ["And that happened {:,} times!".format(count)]
+
+
+def _advance(header, buffer, counts=None):
+    """
+    Yields the diagnosis of the oldest line in buffer, if any, and discards the lines it explains (or, if
+    none, just the oldest line). If counts (of valgrind's errors) is given, a diagnosis is only counted, not
+    yielded, if it explains the same lines as one already yielded, and yielded sans its count of repeats.
+    """
+    help = _help(header, buffer)
+    if not help:
+        buffer.popleft()
+        return
+
+    if counts is not None:
+        key = tuple(help[0])
+        counts[key] += 1
+        if counts[key] == 1:
+            yield help[0], [sentence for sentence in help[1] if not _REPEATED.match(sentence)]
+    else:
+        yield help
+
+    # discard the lines explained, provided they're contiguous
+    before = help[0]
+    if all(i < len(buffer) and line is buffer[i] for i, line in enumerate(before)):
+        for _ in before:
+            buffer.popleft()
+    else:
+        buffer.popleft()
+
+
+def _help(header, buffer):
+    """
+    Returns the first diagnosis, in order of domains and then helpers (as help50 orders them), that begins
+    with the oldest line in buffer.
+    """
+    head = buffer[0]
+    lines = header + list(buffer)
+    for domain in dispatch._domains():
+        for helper in dispatch._candidates(domain, lines):
+            help = helper(lines)
+            if help and help[0] and help[0][0] is head:
+                return help
+
+
+def _clean(line):
+    """Removes line's newline and any ANSI codes, much as help50 does."""
+    return _ANSI.sub("", line.rstrip("\r\n"))
+
+
+if __name__ == "__main__":
+    for before, after in diagnose(sys.stdin):
+        print("\n".join(before))
+        print()
+        print(" ".join(after))
+        print()
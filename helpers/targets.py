@@ -0,0 +1,129 @@
+"""
+Resolves a target that make has no rule to make (e.g., ceasar) to the targets nearest it: the programs whose
+source (a .c file) is in the current directory, the targets in its Makefile, and the problems in a catalogue of
+the course's (e.g., caesar), per an index of their names that's built anew only once one of those has changed.
+"""
+import os
+import re
+
+from . import fuzzy
+
+# a file of the course's problems' names, one per line, if not PROBLEMS
+CATALOGUE = os.environ.get("HELP50_PROBLEMS")
+
+# the course's problems, unless CATALOGUE names others
+PROBLEMS = ("hello", "mario", "cash", "credit", "population", "scrabble", "readability", "caesar", "substitution",
+            "wordle", "plurality", "runoff", "tideman", "sort", "volume", "filter", "recover", "inheritance",
+            "speller", "dictionary", "helpers", "bulbs", "water", "greedy", "initials", "vigenere", "crack",
+            "fifteen", "find", "generate", "resize", "whodunit", "copy", "breakout")
+
+# the makefiles make reads, in order of precedence
+MAKEFILES = ("GNUmakefile", "makefile", "Makefile")
+
+# how many targets to suggest, at most
+LIMIT = 3
+
+# a rule's targets, sans special (e.g., .PHONY), pattern, and variables' targets
+_RULE = re.compile(r"^([^\s#:=.][^#:=]*?)[ \t]*::?(?!=)", re.MULTILINE)
+
+# the course's problems, with CATALOGUE's mtime when read
+_problems = None
+
+# each directory's index, with the mtimes of it, its makefiles, and CATALOGUE when built, keyed on its path
+_indexes = {}
+
+
+def resolve(target, directory=os.curdir, limit=LIMIT):
+    """
+    Returns the targets nearest target (those that can be made in directory before those that can't), as many
+    as limit, among those equally near, unless target is one of them.
+
+      >>> import tempfile
+      >>> directory = tempfile.mkdtemp()
+      >>> for name in ("cesar.c", "Makefile"):
+      ...     with open(os.path.join(directory, name), "w") as f:
+      ...         _ = f.write("speller: speller.c dictionary.c\\n")
+      >>> resolve("casar", directory), resolve("speler", directory), resolve("mairo", directory)
+      (['cesar', 'caesar'], ['speller'], ['mario'])
+      >>> resolve("caesar", directory), resolve("foo", directory)
+      ([], [])
+    """
+    index, local = _index(directory)
+    matches = sorted((d, name not in local, name) for d, name in index.search(target))
+    if not matches or matches[0][0] == 0:
+        return []
+    return [name for d, _, name in matches if d == matches[0][0]][:limit]
+
+
+def problems():
+    """
+    Returns the names of the course's problems, per CATALOGUE (with #-comments, read anew only once it has
+    changed) if any, else PROBLEMS.
+    """
+    global _problems
+    mtime = _mtime(CATALOGUE)
+    if _problems is None or _problems[0] != mtime:
+        names = PROBLEMS
+        if mtime is not None:
+            try:
+                with open(CATALOGUE) as f:
+                    names = [name for name in (line.split("#")[0].strip() for line in f) if name]
+            except OSError:
+                pass
+        _problems = (mtime, frozenset(names))
+    return _problems[1]
+
+
+def rules(text):
+    """
+    Returns the targets of text's rules, a makefile's, other than special targets and patterns.
+
+      >>> sorted(rules('''CFLAGS := -ggdb3
+      ... .PHONY: all clean
+      ... all: speller
+      ... speller speller-debug: speller.c dictionary.c # the checker
+      ... %.o: %.c
+      ... \\t$(CC) -c $<
+      ... clean:
+      ... \\trm -f speller *.o'''))
+      ['all', 'clean', 'speller', 'speller-debug']
+    """
+    return {target for targets in _RULE.findall(text) for target in targets.split()
+            if "%" not in target and "$" not in target}
+
+
+# HELPERS FOR THE HELPERS
+
+def _index(directory):
+    """
+    Returns an index of the targets that can be made in directory and of the course's problems, and the set of
+    the former, built anew if directory, its makefile, or CATALOGUE has changed since last built.
+    """
+    directory = os.path.abspath(directory)
+    key = tuple(_mtime(path) for path in [directory, CATALOGUE] + [os.path.join(directory, makefile)
+                                                                  for makefile in MAKEFILES])
+    built = _indexes.get(directory)
+    if built is None or built[0] != key:
+        local = set()
+        try:
+            with os.scandir(directory) as entries:
+                local.update(entry.name[:-len(".c")] for entry in entries if entry.name.endswith(".c"))
+        except OSError:
+            pass
+        for makefile in MAKEFILES:
+            try:
+                with open(os.path.join(directory, makefile), errors="replace") as f:
+                    local.update(rules(f.read()))
+                break
+            except OSError:
+                pass
+        built = _indexes[directory] = (key, fuzzy.Index(local | problems()), local)
+    return built[1:]
+
+
+def _mtime(path):
+    """Returns path's mtime, else None if there's no such path."""
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
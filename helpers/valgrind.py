@@ -1,10 +1,15 @@
-from collections import namedtuple
-import locale
+from collections import Counter, namedtuple
+import heapq
 import re
+import threading
+from xml.etree import ElementTree
 
-from help50 import helper
+from . import _common
 
-locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
+from help50 import helper, preprocessor
+
+# literals, at least one of which occurs in any output these helpers recognize (see helpers.prefilter)
+LITERALS = ("Memcheck, a memory error detector",)
 
 
 @helper("valgrind")
@@ -24,29 +29,21 @@ def all_heap_blocks_freed(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
-
-        # All heap blocks were freed -- no leaks are possible
-        # ERROR SUMMARY: 0 errors from 0 contexts
-        matches = re.search(r"^==\d+== All heap blocks were freed -- no leaks are possible$", line)
-        if not matches:
-            continue
-
-        for j in range(i+1, len(lines)):
-            matches = re.search(r"^==\d+== ERROR SUMMARY: 0 errors from 0 contexts", lines[j])
-            if not matches:
-                continue
+    # All heap blocks were freed -- no leaks are possible
+    # ERROR SUMMARY: 0 errors from 0 contexts
+    if log.freed is None or log.clean is None:
+        return
 
-            response = [
-                "Looks like your program doesn't have any memory-related errors!",
-                "Be sure, though, to test it with other inputs!"
-            ]
+    response = [
+        "Looks like your program doesn't have any memory-related errors!",
+        "Be sure, though, to test it with other inputs!"
+    ]
 
-            return [line, "...", lines[j]], response
+    return [lines[log.freed], "...", lines[log.clean]], response
 
 
 @helper("valgrind")
@@ -68,37 +65,46 @@ def bytes_definitely_lost(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log or not log.sites:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
-
-        # 40 bytes in 1 blocks are definitely lost in loss record 1 of 1
-        #
-        # 8,013,096 (1,456 direct, 8,011,640 indirect) bytes in 26 blocks are definitely lost in loss record 2 of 2
-        matches = re.search(r"^==\d+== ([\d,]+)(?: \(([\d,]+) direct, ([\d,]+) indirect\))? bytes in ([\d,]+) blocks " \
-            "are definitely lost in loss record [\d,]+ of [\d,]+$", line)
-        if not matches:
-            continue
+    # 40 bytes in 1 blocks are definitely lost in loss record 1 of 1
+    #
+    # 8,013,096 (1,456 direct, 8,011,640 indirect) bytes in 26 blocks are definitely lost in loss record 2 of 2
+    leak = log.first()
 
-        bytes = "bytes" if locale.atoi(matches.group(1)) > 1 else "byte"
+    bytes = "bytes" if _atoi(leak.bytes) > 1 else "byte"
 
-        response = [
-            "Looks like your program leaked {} {} of memory.".format(matches.group(1), bytes),
-            "Did you forget to `free` memory that you allocated via `malloc`?"
-        ]
+    response = [
+        "Looks like your program leaked {} {} of memory.".format(leak.bytes, bytes),
+        "Did you forget to `free` memory that you allocated via `malloc`?"
+    ]
 
-        frames, frame = _frame_extract(lines[i+1:])
-        if frame:
-            if frame.line:
-                response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+    frame = leak.frame
+    if frame:
+        if frame.line:
+            response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+        else:
+            response.append("Take a closer look at `{}`.".format(frame.function))
+            response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
+                "in `valgrind`'s output.")
+
+    # if memory was lost in more than one place, rank those places by how much
+    if len(log.sites) > 1:
+        bytes, blocks = (sum(site[i] for site in log.sites.values()) for i in (0, 1))
+        response.append("In all, your program leaked {:,} bytes in {:,} blocks, allocated in {} different places, " \
+            "the most in:".format(bytes, blocks, len(log.sites)))
+        for frame, (bytes, blocks) in log.top(TOP_LEAKS):
+            if frame and frame.line:
+                place = "line {} of `{}`".format(frame.line, frame.file)
+            elif frame:
+                place = "`{}`".format(frame.function)
             else:
-                response.append("Take a closer look at `{}`.".format(frame.function))
-                response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
-                    "in `valgrind`'s output.")
+                place = "an unknown place"
+            response.append("{} ({:,} bytes in {:,} blocks)".format(place, bytes, blocks))
 
-        return lines[i:i+1+frames], response
+    return lines[leak.index:leak.index+1+leak.frames], response
 
 
 @helper("valgrind")
@@ -117,31 +123,33 @@ def conditional_jump_depends(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
+    # Conditional jump or move depends on uninitialised value(s)
+    error = log.error("conditional jump")
+    if not error:
+        return
 
-        # Conditional jump or move depends on uninitialised value(s)
-        matches = re.search(r"^==\d+== Conditional jump or move depends on uninitialised value\(s\)$", line)
-        if not matches:
-            continue
+    response = [
+        "Looks like you're trying to use a variable that might not have a value?",
+    ]
 
-        response = [
-            "Looks like you're trying to use a variable that might not have a value?",
-        ]
+    frame = error.frame
+    if frame:
+        if frame.line:
+            response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+        else:
+            response.append("Take a closer look at `{}`.".format(frame.function))
+            response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
+                "in `valgrind`'s output.")
 
-        frames, frame = _frame_extract(lines[i+1:])
-        if frame:
-            if frame.line:
-                response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
-            else:
-                response.append("Take a closer look at `{}`.".format(frame.function))
-                response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
-                    "in `valgrind`'s output.")
+    # the same error, with the same stack, again and again
+    if log.counts[error] > 1:
+        response.append("And that happened {:,} times!".format(log.counts[error]))
 
-        return lines[i:i+1], response
+    return lines[error.index:error.index+1], response
 
 
 @helper("valgrind")
@@ -160,28 +168,24 @@ def definitely_lost(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log or not log.lost:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
-
-        # definitely lost: 4 bytes in 1 blocks
-        matches = re.search(r"^==\d+==    definitely lost: ([\d,]+) bytes in ([\d,]+) blocks$", line)
-        if matches and locale.atoi(matches.group(1)) != 0:
-            bytes = "bytes" if locale.atoi(matches.group(1)) > 1 else "byte"
+    # definitely lost: 4 bytes in 1 blocks
+    lost = log.lost
+    bytes = "bytes" if _atoi(lost.bytes) > 1 else "byte"
 
-            response = [
-                "Looks like your program leaked {} {} of memory.".format(matches.group(1), bytes),
-                "Did you forget to `free` memory that you allocated via `malloc`?"
-            ]
+    response = [
+        "Looks like your program leaked {} {} of memory.".format(lost.bytes, bytes),
+        "Did you forget to `free` memory that you allocated via `malloc`?"
+    ]
 
-            matches = re.search(r"^==\d+== Command: ([^\n]+)$.+^==\d+== Rerun with --leak-check=full to see details " \
-                "of leaked memory$", "\n".join(lines), re.DOTALL | re.MULTILINE)
-            if matches:
-                response.append("Run `valgrind --leak-check=full {}` for more details.".format(matches.group(1)))
+    # Rerun with --leak-check=full to see details of leaked memory
+    if log.rerun:
+        response.append("Run `valgrind --leak-check=full {}` for more details.".format(log.command))
 
-            return lines[i:i+1], response
+    return lines[lost.index:lost.index+1], response
 
 
 @helper("valgrind")
@@ -200,34 +204,36 @@ def invalid_read(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
+    # Invalid read of size 8
+    error = log.error("invalid read")
+    if not error:
+        return
 
-        # Invalid read of size 8
-        matches = re.search(r"^==\d+== Invalid read of size ([\d,]+)$", line)
-        if not matches:
-            continue
+    bytes = "bytes" if _atoi(error.size) > 1 else "byte"
 
-        bytes = "bytes" if locale.atoi(matches.group(1)) > 1 else "byte"
+    response = [
+        "Looks like you're trying to access {} {} of memory that isn't yours?".format(error.size, bytes),
+        "Did you try to index into an array beyond its bounds?"
+    ]
 
-        response = [
-            "Looks like you're trying to access {} {} of memory that isn't yours?".format(matches.group(1), bytes),
-            "Did you try to index into an array beyond its bounds?"
-        ]
+    frame = error.frame
+    if frame:
+        if frame.line:
+            response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+        else:
+            response.append("Take a closer look at `{}`.".format(frame.function))
+            response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
+                "in `valgrind`'s output.")
 
-        frames, frame = _frame_extract(lines[i+1:])
-        if frame:
-            if frame.line:
-                response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
-            else:
-                response.append("Take a closer look at `{}`.".format(frame.function))
-                response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
-                    "in `valgrind`'s output.")
+    # the same error, with the same stack, again and again
+    if log.counts[error] > 1:
+        response.append("And that happened {:,} times!".format(log.counts[error]))
 
-        return lines[i:i+1+frames], response
+    return lines[error.index:error.index+1+error.frames], response
 
 
 @helper("valgrind")
@@ -246,34 +252,36 @@ def invalid_write(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
+    # Invalid write of size 4
+    error = log.error("invalid write")
+    if not error:
+        return
 
-        # Invalid write of size 4
-        matches = re.search(r"^==\d+== Invalid write of size ([\d,]+)$", line)
-        if not matches:
-            continue
+    bytes = "bytes" if _atoi(error.size) > 1 else "byte"
 
-        bytes = "bytes" if locale.atoi(matches.group(1)) > 1 else "byte"
+    response = [
+        "Looks like you're trying to modify {} {} of memory that isn't yours?".format(error.size, bytes),
+        "Did you try to store something beyond the bounds of an array?"
+    ]
 
-        response = [
-            "Looks like you're trying to modify {} {} of memory that isn't yours?".format(matches.group(1), bytes),
-            "Did you try to store something beyond the bounds of an array?"
-        ]
+    frame = error.frame
+    if frame:
+        if frame.line:
+            response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+        else:
+            response.append("Take a closer look at `{}`.".format(frame.function))
+            response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
+                "in `valgrind`'s output.")
 
-        frames, frame = _frame_extract(lines[i+1:])
-        if frame:
-            if frame.line:
-                response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
-            else:
-                response.append("Take a closer look at `{}`.".format(frame.function))
-                response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
-                    "in `valgrind`'s output.")
+    # the same error, with the same stack, again and again
+    if log.counts[error] > 1:
+        response.append("And that happened {:,} times!".format(log.counts[error]))
 
-        return lines[i:i+1+frames], response
+    return lines[error.index:error.index+1+error.frames], response
 
 
 @helper("valgrind")
@@ -292,65 +300,511 @@ def use_of_uninitialized_val(lines):
       True
     """
     # check for recognized output
-    if not re.search(r"^==\d+== Memcheck, a memory error detector$", lines[0]):
+    log = _parse(lines)
+    if not log:
         return
 
-    # iterate over lines ourselves
-    for i, line in enumerate(lines):
+    # Use of uninitialized value of size 8
+    error = log.error("uninitialised value")
+    if not error:
+        return
 
-        # Use of uninitialized value of size 8
-        matches = re.search(r"^==\d+== Use of uninitialised value of size ([\d,]+)$", line)
-        if not matches:
-            continue
+    response = [
+        "Looks like you're trying to use a {}-byte variable that might not have a value?".format(error.size)
+    ]
 
-        response = [
-            "Looks like you're trying to use a {}-byte variable that might not have a value?".format(matches.group(1))
-        ]
+    frame = error.frame
+    if frame:
+        if frame.line:
+            response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
+        else:
+            response.append("Take a closer look at `{}`.".format(frame.function))
+            response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
+                "in `valgrind`'s output.")
 
-        frames, frame = _frame_extract(lines[i+1:])
-        if frame:
-            if frame.line:
-                response.append("Take a closer look at line {} of `{}`.".format(frame.line, frame.file))
-            else:
-                response.append("Take a closer look at `{}`.".format(frame.function))
-                response.append("And be sure to compile your program with `-ggdb3` to see line numbers " \
-                    "in `valgrind`'s output.")
+    # the same error, with the same stack, again and again
+    if log.counts[error] > 1:
+        response.append("And that happened {:,} times!".format(log.counts[error]))
+
+    return lines[error.index:error.index+1+error.frames], response
+
+
+@preprocessor("valgrind")
+def xml_output(output):
+    """
+    Renders Memcheck's XML (per --xml=yes) as the text it would otherwise have output, parsing it incrementally
+    into the very _Log that the helpers query, so that the text needn't be parsed again. Any other output is
+    returned as is.
+
+      >>> print(xml_output('''<?xml version="1.0"?>
+      ... <valgrindoutput>
+      ... <pid>4412</pid>
+      ... <argv><exe>./a.out</exe><arg>foo</arg></argv>
+      ... <error>
+      ...   <unique>0x0</unique>
+      ...   <kind>InvalidRead</kind>
+      ...   <what>Invalid read of size 4</what>
+      ...   <stack>
+      ...     <frame><ip>0x40054F</ip><obj>/tmp/a.out</obj><fn>main</fn><file>foo.c</file><line>7</line></frame>
+      ...   </stack>
+      ... </error>
+      ... <errorcounts><pair><count>2</count><unique>0x0</unique></pair></errorcounts>
+      ... </valgrindoutput>'''))
+      ==4412== Memcheck, a memory error detector
+      ==4412== Command: ./a.out foo
+      ==4412== Invalid read of size 4
+      ==4412==    at 0x40054F: main (foo.c:7)
+      ==4412==
+      ==4412== ERROR SUMMARY: 2 errors from 1 contexts
+    """
+    start = output.find("<valgrindoutput")
+    if start < 0:
+        return output
+
+    declaration = output.rfind("<?xml", 0, start)
+    start = declaration if declaration >= 0 else start
+    end = output.find("</valgrindoutput>", start)
+    end = len(output) if end < 0 else end + len("</valgrindoutput>")
 
-        return lines[i:i+1+frames], response
+    log = _Log()
+    try:
+        rendered = "\n".join(_ingest((output[i:min(i + _CHUNK, end)] for i in range(start, end, _CHUNK)), log))
+    except ElementTree.ParseError:
+        return output
+
+    _state.ingested = (rendered, log)
+    return "\n".join([output[:start].rstrip("\n"), rendered, output[end:].lstrip("\n")]).strip("\n")
 
 
 # HELPER FOR THE HELPERS
 
-# Parses lines for stack frames, returning (frames, frame), where frames is the number of frames parsed,
-# and frame is a tuple with address, function, file, and line fields representing the likely source of an error.
-def _frame_extract(lines):
-
-    # identify possible frames
-    frames = []
-    Frame = namedtuple("Frame", ["address", "function", "file", "line"])
-    for line in lines:
-        matches = re.search(r"^==\d+==    (?:at|by) (0x[0-9A-Fa-f]+): (.+) \((.+?)(?::(\d+))?\)", line)
-        if matches:
-            frames.append(Frame(address=matches.group(1), function=matches.group(2), file=matches.group(3),
-                                line=matches.group(4)))
+# how many of the places in which memory was lost to rank, if more than one
+TOP_LEAKS = 3
+
+Frame = namedtuple("Frame", ["address", "function", "file", "line"])
+
+# an error (e.g., "Invalid read of size 8") and, for each, the index of its line in the log, the number of stack
+# frames that follow it, and the frame likeliest to be the source of the error
+_Error = namedtuple("_Error", ["kind", "size", "index", "frames", "frame"])
+
+# a loss record (e.g., "40 bytes in 1 blocks are definitely lost in loss record 1 of 1"), likewise
+_Leak = namedtuple("_Leak", ["bytes", "direct", "indirect", "blocks", "index", "frames", "frame"])
+
+# the LEAK SUMMARY's "definitely lost: 4 bytes in 1 blocks"
+_Lost = namedtuple("_Lost", ["bytes", "blocks", "index"])
+
+# Memcheck's banner, which begins its output
+_MEMCHECK = re.compile(_common.MEMCHECK)
+
+# a stack frame, sans "==4412== "
+_FRAME = re.compile(r"^   (?:at|by) (0x[0-9A-Fa-f]+): (.+) \((.+?)(?::(\d+))?\)")
+
+# every line of Memcheck's output that a helper cares about, as one alternation so that each line costs one regex
+_LINE = re.compile(r"^==\d+== (?:"
+    r"   (?:at|by) (?P<address>0x[0-9A-Fa-f]+): (?P<function>.+) \((?P<file>.+?)(?::(?P<line>\d+))?\)"
+    r"|Invalid (?P<access>read|write) of size (?P<access_size>[\d,]+)$"
+    r"|Use of uninitialised value of size (?P<use_size>[\d,]+)$"
+    r"|(?P<jump>Conditional jump or move depends on uninitialised value\(s\))$"
+    r"|(?P<leak_bytes>[\d,]+)(?: \((?P<direct>[\d,]+) direct, (?P<indirect>[\d,]+) indirect\))? "
+        r"bytes in (?P<leak_blocks>[\d,]+) blocks are definitely lost in loss record [\d,]+ of [\d,]+$"
+    r"|   definitely lost: (?P<lost_bytes>[\d,]+) bytes in (?P<lost_blocks>[\d,]+) blocks$"
+    r"|(?P<freed>All heap blocks were freed -- no leaks are possible)$"
+    r"|ERROR SUMMARY: (?P<errors>[\d,]+) errors from (?P<contexts>[\d,]+) contexts"
+    r"|Command: (?P<command>.+)$"
+    r"|(?P<rerun>Rerun with --leak-check=full to see details of leaked memory)$"
+    r")")
+
+
+class _Log:
+    """A model of Memcheck's output, with the errors, loss records, and summaries that helpers query."""
+
+    def __init__(self):
+        self.command = None
+
+        # each distinct error, keyed on its fingerprint, and how many times each occurred
+        self.errors = []
+        self.fingerprints = {}
+        self.counts = Counter()
+        self.lost = None
+        self.freed = None
+        self.clean = None
+        self.rerun = False
+        self.summary = None
+
+        # bytes and blocks definitely lost, summed across loss records, and the first such record, keyed on the
+        # frame likeliest to have allocated them
+        self.sites = {}
+
+    def error(self, kind):
+        """Returns the first error of the given kind, if any."""
+        for error in self.errors:
+            if error.kind == kind:
+                return error
+
+    def record(self, kind, size, index, frames, count=1):
+        """
+        Records an error of the given kind and size, at index, with the given stack frames (as Frames or as yet
+        unparsed text), unless the same error (per its kind, size, and frames) has already been recorded, in which
+        case it's only counted (and its frames needn't be parsed, nor its likeliest source inferred, anew). Returns
+        the error, else None if its size isn't a valid count, in which case it's not recorded.
+
+          >>> log = _Log()
+          >>> for index in [0, 3, 6]:
+          ...     error = log.record("invalid read", "4", index, [Frame("0x40054F", "foo", "foo.c", "7")])
+          >>> len(log.errors), log.counts[log.errors[0]], log.errors[0].index
+          (1, 3, 0)
+          >>> log.record("invalid read", "1,23", 9, []) is None, len(log.errors)
+          (True, 1)
+        """
+        if size is not None and _atoi(size) is None:
+            return None
+
+        fingerprint = (kind, size, tuple(frames))
+        error = self.fingerprints.get(fingerprint)
+        if error is None:
+            frames = _frames(frames)
+            error = self.fingerprints[fingerprint] = _Error(kind, size, index, len(frames), _frame_extract(frames))
+            self.errors.append(error)
+        self.counts[error] += count
+        return error
+
+    def leak(self, leak):
+        """
+        Records a loss record, adding its bytes and blocks to those of its allocation site, but keeping the record
+        itself only if it's the site's first. A record whose counts aren't valid is skipped.
+
+          >>> log = _Log()
+          >>> for bytes, line in [("40", "42"), ("8", "42"), ("2", "9")]:
+          ...     log.leak(_Leak(bytes, None, None, "1", int(line), 1, Frame("0x0", "load", "dictionary.c", line)))
+          >>> log.first().bytes, [(frame.line, bytes, leak.index) for frame, (bytes, blocks, leak) in log.sites.items()]
+          ('40', [('42', 48, 42), ('9', 2, 9)])
+        """
+        bytes, blocks = _atoi(leak.bytes), _atoi(leak.blocks)
+        if bytes is None or blocks is None:
+            return
+
+        site = self.sites.get(leak.frame)
+        if site is None:
+            site = self.sites[leak.frame] = [0, 0, leak]
+        site[0] += bytes
+        site[1] += blocks
+
+    def first(self):
+        """Returns the first loss record, if any."""
+        for bytes, blocks, leak in self.sites.values():
+            return leak
+
+    def top(self, k):
+        """
+        Returns the k allocation sites whereat the most bytes were lost, most first, as (frame, (bytes, blocks)).
+
+          >>> log = _Log()
+          >>> for bytes, line in [("40", "42"), ("1,456", "57"), ("8", "42"), ("2", "9")]:
+          ...     log.leak(_Leak(bytes, None, None, "1", 0, 1, Frame("0x0", "load", "dictionary.c", line)))
+          >>> [(frame.line, bytes) for frame, (bytes, blocks) in log.top(2)]
+          [('57', 1456), ('42', 48)]
+        """
+        return [(frame, (bytes, blocks)) for frame, (bytes, blocks, leak)
+                in heapq.nlargest(k, self.sites.items(), key=lambda site: site[1][0])]
+
+
+class _Parser:
+    """
+    Builds a _Log from Memcheck's output one line at a time, so that the log is only ever walked once.
+
+      >>> parser = _Parser()
+      >>> for line in ["==1== Invalid read of size 4",
+      ...              "==1==    at 0x40054F: foo (foo.c:7)",
+      ...              "==1==    by 0x400568: main (foo.c:12)",
+      ...              "==1== ERROR SUMMARY: 1 errors from 1 contexts"]:
+      ...     parser.feed(line)
+      >>> log = parser.close()
+      >>> log.errors[0].frames, log.errors[0].frame.line, log.summary
+      (2, '7', ('1', '1'))
+    """
+
+    def __init__(self):
+        self.log = _Log()
+        self._index = 0
+        self._record = None
+        self._frames = []
+
+    def feed(self, line):
+        """Parses the next line of output."""
+        index = self._index
+        self._index += 1
+
+        # at 0x4C2AB80: malloc (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so), kept as text until its
+        # error proves not to be a repeat
+        if self._record and line.startswith("=="):
+            start = line.find("== ", 2) + 3
+            if start > 2 and line.startswith(("   at 0x", "   by 0x"), start):
+                self._frames.append(line[start:])
+                return
+
+        matches = _LINE.search(line)
+        if matches and matches.group("address"):
+            return
+
+        self._flush()
+        if not matches:
+            return
+
+        log = self.log
+        if matches.group("access"):
+            self._record = ("invalid " + matches.group("access"), matches.group("access_size"), index)
+        elif matches.group("use_size"):
+            self._record = ("uninitialised value", matches.group("use_size"), index)
+        elif matches.group("jump"):
+            self._record = ("conditional jump", None, index)
+        elif matches.group("leak_bytes"):
+            self._record = ("leak",) + matches.group("leak_bytes", "direct", "indirect", "leak_blocks") + (index,)
+        elif matches.group("lost_bytes"):
+            bytes, blocks = _atoi(matches.group("lost_bytes")), _atoi(matches.group("lost_blocks"))
+            if not log.lost and bytes and blocks is not None:
+                log.lost = _Lost(matches.group("lost_bytes"), matches.group("lost_blocks"), index)
+        elif matches.group("freed"):
+            if log.freed is None:
+                log.freed = index
+        elif matches.group("errors"):
+            log.summary = matches.group("errors", "contexts")
+
+            # ERROR SUMMARY: 0 errors from 0 contexts, after All heap blocks were freed
+            if log.freed is not None and log.clean is None and log.summary == ("0", "0"):
+                log.clean = index
+        elif matches.group("command"):
+            if log.command is None:
+                log.command = matches.group("command")
+        elif matches.group("rerun"):
+            if log.command is not None:
+                log.rerun = True
+
+    def close(self):
+        """Finishes parsing and returns the log."""
+        self._flush()
+        return self.log
+
+    def _flush(self):
+        """Records the error or loss record whose stack frames were being collected, if any."""
+        if not self._record:
+            return
+
+        if self._record[0] == "leak":
+            frames = _frames(self._frames)
+            self.log.leak(_Leak(*self._record[1:], frames=len(frames), frame=_frame_extract(frames)))
         else:
-            break
+            self.log.record(*self._record, frames=self._frames)
+
+        self._record = None
+        self._frames = []
+
+
+# this thread's most recently parsed lines and their _Log (as parsed), and the text it most recently rendered
+# from XML and its _Log (as ingested), lest concurrent diagnoses see each other's
+_state = threading.local()
+
+
+def _parse(lines):
+    """
+    Returns a _Log of lines if they're Memcheck's output, else None. Because help50 hands the same lines to
+    each helper in turn, the most recent log is cached, as is the log of the text most recently rendered from XML.
+    """
+    parsed = getattr(_state, "parsed", None)
+    if parsed and parsed[0] is lines:
+        return parsed[1]
+
+    log = None
+    ingested = getattr(_state, "ingested", None)
+    if ingested and lines and ingested[0].startswith(lines[0]) and _begins(lines, ingested[0]):
+        log = ingested[1]
+    elif lines and _MEMCHECK.search(lines[0]):
+        parser = _Parser()
+        for line in lines:
+            parser.feed(line)
+        log = parser.close()
+
+    _state.parsed = (lines, log)
+    return log
+
+
+def _begins(lines, text):
+    """
+    Returns whether lines begin with text's lines.
+
+      >>> _begins(["==1== Memcheck", "==1== ERROR SUMMARY: 0 errors from 0 contexts"], "==1== Memcheck")
+      True
+      >>> _begins(["==1== Memcheck, a memory error detector"], "==1== Memcheck")
+      False
+    """
+    joined = "\n".join(lines)
+    return joined.startswith(text) and joined[len(text):len(text) + 1] in ("", "\n")
+
+
+# how much XML to parse at a time
+_CHUNK = 1 << 16
+
+# the kinds of errors (per XML's <kind>) that helpers care about, and their names per _Error
+_KINDS = {
+    "InvalidRead": "invalid read",
+    "InvalidWrite": "invalid write",
+    "UninitValue": "uninitialised value",
+    "UninitCondition": "conditional jump"
+}
+
+# the elements whose ends _ingest handles, all others being parts thereof
+_TAGS = frozenset(["pid", "argv", "error", "errorcounts"])
+
+# an error's size and a loss record's direct and indirect bytes, per their text
+_SIZE = re.compile(r"of size ([\d,]+)$")
+_DIRECT = re.compile(r"\(([\d,]+) direct, ([\d,]+) indirect\)")
+
+
+def _ingest(chunks, log):
+    """
+    Parses Memcheck's XML, fed in chunks, into log, yielding the lines of text that Memcheck would otherwise
+    have output as each is rendered. Each error's element is cleared once rendered, so the tree isn't kept (but
+    for an empty element per error), only the log. Stack frames are taken as is from the XML, rather than parsed
+    from text, whence the likeliest source of each error is inferred as usual.
+    """
+    parser = ElementTree.XMLPullParser(events=("end",))
+    prefix = "==0=="
+
+    # how many lines have been yielded
+    index = 0
+    uniques = []
+    counts = {}
+
+    # the errors that helpers care about, keyed on their uniques, whose counts are only known at the end
+    errors = {}
+    lost = [0, 0]
+
+    def elements():
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    for event, element in elements():
+        if element.tag not in _TAGS:
+            continue
+
+        if element.tag == "pid":
+            prefix = "=={}==".format(element.text.strip())
+            yield "{} Memcheck, a memory error detector".format(prefix)
+            index += 1
+        elif element.tag == "argv":
+            log.command = " ".join(arg.text or "" for arg in element.iter() if arg.tag in ("exe", "arg"))
+            yield "{} Command: {}".format(prefix, log.command)
+            index += 1
+        elif element.tag == "error":
+            kind = element.findtext("kind", "")
+            what = element.findtext("what") or element.findtext("xwhat/text") or kind
+            first = index
+            yield "{} {}".format(prefix, what)
+            index += 1
+
+            frames = []
+            stack = element.find("stack")
+            for frame in stack.iter("frame") if stack is not None else []:
+                file, line = frame.findtext("file"), frame.findtext("line")
+                if file is None:
+                    file, line = "in " + frame.findtext("obj", "???"), None
+                frames.append(Frame(frame.findtext("ip", "0x0"), frame.findtext("fn", "???"), file, line))
+                yield "{}    {} {}: {} ({}{})".format(prefix, "by" if len(frames) > 1 else "at", frames[-1].address,
+                                                    frames[-1].function, file, ":" + line if line else "")
+                index += 1
+
+            if kind in _KINDS:
+                size = _SIZE.search(what)
+                error = log.record(_KINDS[kind], size.group(1) if size else None, first, frames, count=0)
+                if error:
+                    errors[element.findtext("unique")] = error
+            elif kind == "Leak_DefinitelyLost":
+                bytes = int(element.findtext("xwhat/leakedbytes", "0"))
+                blocks = int(element.findtext("xwhat/leakedblocks", "0"))
+                direct = _DIRECT.search(what)
+                log.leak(_Leak("{:,}".format(bytes), direct and direct.group(1), direct and direct.group(2),
+                               "{:,}".format(blocks), first, len(frames), _frame_extract(frames)))
+                lost[0] += bytes
+                lost[1] += blocks
+
+            uniques.append(element.findtext("unique"))
+            yield prefix
+            index += 1
+            element.clear()
+        elif element.tag == "errorcounts":
+            counts.update((pair.findtext("unique"), int(pair.findtext("count", "1"))) for pair in element.iter("pair"))
+            element.clear()
+
+    if lost[0]:
+        yield "{} LEAK SUMMARY:".format(prefix)
+        log.lost = _Lost("{:,}".format(lost[0]), "{:,}".format(lost[1]), index + 1)
+        yield "{}    definitely lost: {} bytes in {} blocks".format(prefix, log.lost.bytes, log.lost.blocks)
+
+    for unique, error in errors.items():
+        log.counts[error] += counts.get(unique, 1)
+
+    log.summary = ("{:,}".format(sum(counts.get(unique, 1) for unique in uniques)), "{:,}".format(len(uniques)))
+    yield "{} ERROR SUMMARY: {} errors from {} contexts".format(prefix, *log.summary)
+
+
+# one of valgrind's counts, e.g., 8,013,096
+_COUNT = re.compile(r"^(?:\d{1,3}(?:,\d{3})*|\d+)$")
+
+
+def _atoi(string):
+    """
+    Converts one of valgrind's counts, whose digits are grouped by commas irrespective of locale, to an int, else
+    returns None if string isn't such a count, whereupon callers skip whatever it counts.
+
+      >>> _atoi("8,013,096"), _atoi("40"), _atoi("1456")
+      (8013096, 40, 1456)
+      >>> _atoi("8,01"), _atoi("1,23")
+      (None, None)
+    """
+    if not _COUNT.match(string):
+        return None
+    return int(string.replace(",", ""))
+
+
+def _frames(frames):
+    """
+    Returns frames as Frames, parsing those still text, up to the first that isn't a stack frame after all.
+
+      >>> [frame.file for frame in _frames(["   at 0x40054F: foo (foo.c:7)", "   by 0x400568: main (in /tmp/a.out)",
+      ...                                    "   at 0x0: ???", "   by 0x400568: main (foo.c:12)"])]
+      ['foo.c', 'in /tmp/a.out']
+    """
+    parsed = []
+    for frame in frames:
+        if isinstance(frame, str):
+            matches = _FRAME.match(frame)
+            if not matches:
+                break
+            frame = Frame(*matches.groups())
+        parsed.append(frame)
+    return parsed
+
+
+# Given a list of stack frames, returns the one likeliest to represent the source of an error.
+def _frame_extract(frames):
 
     # infer actual frame
-    frames.reverse()
+    frames = frames[::-1]
     for i in range(len(frames)-1):
 
         # at 0x4C2AB80: malloc (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so)
         # by 0x400546: foo (foo.c:6)
         # by 0x400568: main (foo.c:12)
         if (frames[i].line and not frames[i+1].line):
-            return len(frames), frames[i]
+            return frames[i]
 
         # at 0x4C2AB80: malloc (in /usr/lib/valgrind/vgpreload_memcheck-amd64-linux.so)
         # by 0x400546: foo (in /srv/www/foo)
         # by 0x400568: main (in /srv/www/foo)
         if (not frames[i].line and frames[i].file != frames[i+1].file):
-            return len(frames), frames[i]
+            return frames[i]
 
         # at 0x508299B: _itoa_word (_itoa.c:179)
         # by 0x5086636: vfprintf (vfprintf.c:1660)
@@ -359,8 +813,8 @@ def _frame_extract(lines):
         # by 0x508D3D8: printf (printf.c:33)
         # by 0x40054C: main (foo.c:6)
         if (frames[i].line and frames[i+1].line and len(frames[i].address) < len(frames[i+1].address)):
-            return len(frames), frames[i]
+            return frames[i]
 
     # at 0x40054F: foo (foo.c:7)
     # by 0x400568: main (foo.c:12)
-    return (len(frames), frames[len(frames)-1]) if frames else (0, None)
+    return frames[-1] if frames else None
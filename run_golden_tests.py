@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Compiles (and, for runtime and valgrind, runs) each sample in test_files/, in parallel, and checks that the helper
+after which the sample is named (e.g., unused_var for clang/unused_var.c) recognizes its output. Outputs are
+cached, keyed on each sample's source and the toolchain's version, so that reruns needn't compile or run anything.
+
+Usage: ./run_golden_tests.py [--cc CC] [--workers N] [--refresh] [DOMAIN ...]
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from helpers import dispatch, metrics
+
+# where the samples live, in a subdirectory per domain
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_files")
+
+# where outputs are cached
+CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "help50", "golden")
+
+# how samples are compiled, per CS50's own flags, for clang's samples and for those that are run
+FLAGS = ["-ggdb3", "-O0", "-std=c11", "-Wall", "-Werror", "-Wextra", "-Wno-sign-compare", "-Wno-unused-parameter",
+         "-Wshadow"]
+RUN_FLAGS = ["-ggdb3", "-O0", "-std=c11"]
+
+# how valgrind is run
+VALGRIND = ["valgrind", "--leak-check=full"]
+
+# how long, in seconds, a sample may take to compile or run
+TIMEOUT = 60
+
+# samples whose names aren't their helpers'
+ALIASES = {
+    "expected_if_closing_parens": "expected_if_open_parens",
+    "use_of_undeclared_identifier": "use_of_undeclared_indentifier",
+    "use_of_uninitialised_val": "use_of_uninitialized_val"
+}
+
+Sample = namedtuple("Sample", ["domain", "path", "helper"])
+
+
+class Skip(Exception):
+    """Raised when a sample can't be compiled or run herein (e.g., for want of valgrind)."""
+
+
+def samples(domains):
+    """Returns every sample in domains' directories, with the name of the helper that should recognize it."""
+    samples = []
+    for domain in domains:
+        directory = os.path.join(ROOT, domain)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".c"):
+                stem = name[:-len(".c")].rstrip("0123456789")
+                samples.append(Sample(domain, os.path.join(directory, name), ALIASES.get(stem, stem)))
+    return samples
+
+
+def capture(sample, cc, refresh=False):
+    """
+    Returns (output, cached, seconds) for sample, compiling and running it if its output isn't cached (or if
+    refresh). Raises Skip if the toolchain it needs is missing.
+    """
+    with open(sample.path, "rb") as f:
+        source = f.read()
+
+    binary = os.path.splitext(sample.path)[0]
+    compiler = version(cc)
+    if compiler is None and (sample.domain == "clang" or not os.path.exists(binary)):
+        raise Skip("{} not found".format(cc))
+    if sample.domain == "valgrind" and version(VALGRIND[0]) is None:
+        raise Skip("{} not found".format(VALGRIND[0]))
+
+    # if there's no compiler, samples are run as prebuilt, whereby the binary's contents matter instead
+    if compiler is None:
+        with open(binary, "rb") as f:
+            source += f.read()
+    key = hashlib.sha256(json.dumps([sample.domain, source.hex(), compiler, FLAGS, RUN_FLAGS,
+                                     version(VALGRIND[0]) if sample.domain == "valgrind" else None]).encode())
+    path = os.path.join(CACHE, key.hexdigest() + ".json")
+
+    if not refresh:
+        try:
+            with open(path) as f:
+                return json.load(f)["output"], True, 0.0
+        except (OSError, ValueError, KeyError):
+            pass
+
+    start = time.perf_counter()
+    directory, name = os.path.split(sample.path)
+    with tempfile.TemporaryDirectory() as build:
+        if sample.domain == "clang":
+            output = _run([cc] + FLAGS + ["-o", os.path.join(build, "a.out"), name, "-lm"], directory)
+        else:
+            if compiler is not None:
+                binary = os.path.join(build, "a.out")
+                _run([cc] + RUN_FLAGS + ["-o", binary, name, "-lm"], directory)
+            command = [binary] if sample.domain == "runtime" else VALGRIND + [binary]
+            output = _run(command, directory)
+    seconds = time.perf_counter() - start
+
+    os.makedirs(CACHE, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=CACHE, delete=False) as f:
+        json.dump({"output": output}, f)
+    os.replace(f.name, path)
+    return output, False, seconds
+
+
+def fired(domain, output):
+    """Returns (the name of the helper whose help dispatch gives for output, else None, and its seconds)."""
+    metrics.reset()
+    dispatch.diagnose(output, [domain])
+    helpers = metrics.snapshot().get(domain, {})
+    seconds = sum(helper["seconds"] for helper in helpers.values())
+    return next((name for name, helper in helpers.items() if helper["matches"]), None), seconds
+
+
+# each tool's version, keyed on its name
+_versions = {}
+
+
+def version(tool):
+    """Returns the first line of tool's --version, else None if tool isn't installed."""
+    if tool not in _versions:
+        try:
+            result = subprocess.run([tool, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    universal_newlines=True, timeout=TIMEOUT)
+            _versions[tool] = (result.stdout.splitlines() or [""])[0]
+        except OSError:
+            _versions[tool] = None
+    return _versions[tool]
+
+
+def _run(command, cwd):
+    """Returns command's stdout and stderr, followed by the signal that killed it, if any, as a shell would."""
+    result = subprocess.run(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            universal_newlines=True, errors="replace", timeout=TIMEOUT)
+    output = result.stdout
+    if result.returncode < 0:
+        output += signal.strsignal(-result.returncode) + "\n"
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cc", default=os.environ.get("CC", "clang"), help="the compiler (default: $CC or clang)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="samples to compile or run at once")
+    parser.add_argument("-r", "--refresh", action="store_true", help="ignore cached outputs")
+    parser.add_argument("domains", nargs="*", default=["clang", "runtime", "valgrind"])
+    args = parser.parse_args()
+
+    # resolve versions before fanning out, lest threads race to
+    version(args.cc)
+    version(VALGRIND[0])
+
+    metrics.enable()
+    failures = skips = 0
+    with concurrent.futures.ThreadPoolExecutor(args.workers) as executor:
+        futures = [(sample, executor.submit(capture, sample, args.cc, args.refresh))
+                   for sample in samples(args.domains)]
+        for sample, future in futures:
+            name = os.path.relpath(sample.path, ROOT)
+            try:
+                output, cached, seconds = future.result()
+            except Skip as e:
+                skips += 1
+                print("SKIP {:<50} {}".format(name, e))
+                continue
+            except (OSError, subprocess.SubprocessError) as e:
+                failures += 1
+                print("FAIL {:<50} {}".format(name, e))
+                continue
+
+            helper, diagnosis = fired(sample.domain, output)
+            failures += helper != sample.helper
+            print("{} {:<50} {:<32} {:>10} {:>10.1f} µs".format(
+                "ok  " if helper == sample.helper else "FAIL", name, str(helper),
+                "cached" if cached else "{:.0f} ms".format(seconds * 1e3), diagnosis * 1e6))
+            if helper != sample.helper:
+                print("     expected {}, given:\n     {}".format(sample.helper,
+                                                               "\n     ".join(output.splitlines())))
+
+    print("\n{} samples, {} failed, {} skipped".format(len(futures), failures, skips))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
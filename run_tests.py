@@ -1,19 +1,114 @@
 #!/usr/bin/env python3
+"""
+Runs every helper module's doctests, across a pool of processes, and reports how long each docstring's examples
+took, slowest first.
+
+Usage: ./run_tests.py [--workers N] [--budget MS] [--top N]
+"""
+import argparse
+import concurrent.futures
 import doctest
-import inspect
-import unittest
+import importlib
+import os
+import pkgutil
+import sys
+import time
 
 import helpers
 
-# helpers use doctest for their tests, but we convert doctest to unittest since unittest has nicer output
-testSuite = unittest.TestSuite()
 
-for member in dir(helpers):
-    mod = getattr(helpers, member)
-    if inspect.ismodule(mod):
-        testSuite.addTests(doctest.DocTestSuite(mod))
+class _Runner(doctest.DocTestRunner):
+    """A DocTestRunner that times each example, from its start through the report of its outcome."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.examples = []
+        self._start = None
+
+    def report_start(self, out, test, example):
+        self._start = time.perf_counter()
+        super().report_start(out, test, example)
+
+    def report_success(self, out, test, example, got):
+        self._time(test, example)
+        super().report_success(out, test, example, got)
+
+    def report_failure(self, out, test, example, got):
+        self._time(test, example)
+        super().report_failure(out, test, example, got)
+
+    def report_unexpected_exception(self, out, test, example, exc_info):
+        self._time(test, example)
+        super().report_unexpected_exception(out, test, example, exc_info)
+
+    def _time(self, test, example):
+        self.examples.append((test.name, (test.lineno or 0) + example.lineno + 1, time.perf_counter() - self._start))
+
+
+def run(name):
+    """
+    Runs module name's doctests, returning, for each docstring with examples, (its name, its examples' count,
+    their failures, and their seconds), plus the seconds each example took, as (name, line, seconds), and the
+    report of any failures.
+    """
+    module = importlib.import_module(name)
+    report = []
+    runner = _Runner(verbose=False)
+    tests = []
+    for test in sorted(doctest.DocTestFinder().find(module)):
+        if not test.examples:
+            continue
+        start = time.perf_counter()
+        failures, tries = runner.run(test, out=report.append, clear_globs=True)
+        tests.append((test.name, tries, failures, time.perf_counter() - start))
+    return tests, runner.examples, "".join(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes across which to run modules' doctests (1 to run them in this one)")
+    parser.add_argument("-b", "--budget", type=float,
+                        help="milliseconds beyond which any one example fails")
+    parser.add_argument("-t", "--top", type=int, default=10,
+                        help="how many of the slowest docstrings to report (0 for all)")
+    args = parser.parse_args()
+
+    # helpers use doctest for their tests, each module's run in a process of its own
+    names = ["{}.{}".format(helpers.__name__, module.name) for module in pkgutil.iter_modules(helpers.__path__)]
+    start = time.perf_counter()
+    if args.workers == 1:
+        results = list(map(run, names))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(args.workers) as executor:
+            results = list(executor.map(run, names))
+    elapsed = time.perf_counter() - start
+
+    tests = [test for result in results for test in result[0]]
+    examples = [example for result in results for example in result[1]]
+    failures = sum(1 for test in tests if test[2])
+    for result in results:
+        sys.stdout.write(result[2])
+
+    print("{:<60} {:>10} {:>10}".format("slowest", "examples", "ms"))
+    for name, tries, _, seconds in sorted(tests, key=lambda test: test[3], reverse=True)[:args.top or None]:
+        print("{:<60} {:>10} {:>10.1f}".format(name, tries, seconds * 1e3))
+
+    over = []
+    if args.budget is not None:
+        over = [example for example in examples if example[2] * 1e3 > args.budget]
+        for name, line, seconds in over:
+            print("OVER BUDGET: {}, line {}: {:.1f} ms > {} ms".format(name, line, seconds * 1e3, args.budget))
+
+    print("-" * 70)
+    print("Ran {} tests in {:.3f}s".format(len(tests), elapsed))
+    print()
+    if failures or over:
+        print("FAILED (failures={}{})".format(failures, ", over budget={}".format(len(over)) if over else ""))
+        return 1
+    print("OK")
+    return 0
 
 
 if __name__ == "__main__":
-    runner = unittest.TextTestRunner()
-    runner.run(testSuite)
+    sys.exit(main())